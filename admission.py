@@ -0,0 +1,73 @@
+"""
+Controle de admissão adaptativo
+
+Limita quantas análises rodam ao mesmo tempo. O limite se ajusta pela latência
+observada no estilo AIMD: cresce devagar (aditivo) enquanto as requisições
+terminam dentro da meta e cai rápido (multiplicativo) quando a ultrapassam.
+Acima do limite, uma fração configurável das requisições é atendida pelo
+caminho degradado (análise local) e as demais são rejeitadas de imediato.
+"""
+
+import random
+from enum import Enum
+from typing import Any, Callable, Dict
+
+
+class Admission(Enum):
+    ADMITTED = "admitted"
+    DEGRADED = "degraded"
+    REJECTED = "rejected"
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limite de concorrência AIMD guiado pela latência das requisições admitidas"""
+
+    def __init__(self, initial_limit: int = 32, min_limit: int = 2, max_limit: int = 512,
+                 latency_target: float = 2.0, backoff: float = 0.9,
+                 degrade_ratio: float = 0.0, enabled: bool = True,
+                 rng: Callable[[], float] = random.random):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.degrade_ratio = degrade_ratio
+        self.enabled = enabled
+        self._rng = rng
+        self.in_flight = 0
+        # Métricas
+        self.admitted = 0
+        self.degraded = 0
+        self.rejected = 0
+
+    def admit(self) -> Admission:
+        """Decide se a requisição entra, vai para o caminho degradado ou é rejeitada"""
+        if not self.enabled or self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self.admitted += 1
+            return Admission.ADMITTED
+        if self._rng() < self.degrade_ratio:
+            self.degraded += 1
+            return Admission.DEGRADED
+        self.rejected += 1
+        return Admission.REJECTED
+
+    def release(self, latency: float):
+        """Libera a vaga de uma requisição admitida e ajusta o limite pela latência"""
+        self.in_flight -= 1
+        if latency > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Só cresce quando o limite está de fato sendo usado
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "latency_target_ms": round(self.latency_target * 1000),
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+        }
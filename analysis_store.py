@@ -0,0 +1,273 @@
+"""
+Armazenamento compacto das análises em cache
+
+Cada análise é guardada como um registro com __slots__: palavras internadas,
+sentimento codificado como inteiro, confiança em float32 e campos numéricos
+empacotados em um único objeto bytes.
+
+O texto original pode ser guardado de acordo com o modo de armazenamento:
+
+- ``full``: texto integral em uma arena compartilhada (um único bytearray UTF-8),
+  referenciado por offset e tamanho
+- ``zlib`` / ``zstd``: texto comprimido individualmente no registro
+- ``index``: apenas as palavras do texto e suas contagens, sem o texto (a ordem
+  das palavras se perde, então buscas por frases não são suportadas)
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from text_processing import tokenize
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+STORAGE_MODES: Tuple[str, ...] = ("full", "zlib", "zstd", "index")
+
+# Rótulos de sentimento codificados como inteiros
+SENTIMENT_LABELS: Tuple[str, ...] = ("neutro", "positivo", "negativo")
+SENTIMENT_CODES: Dict[str, int] = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+# Código reservado para rótulos fora do vocabulário conhecido
+_OTHER_SENTIMENT = 255
+
+# Cabeçalho empacotado: timestamp (µs desde a época), offset e tamanho do texto,
+# contagem de palavras, código do sentimento, flag de confiança e confiança (float32)
+_HEADER = struct.Struct("<qQIIBBf")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def compress_text(text: str, mode: str, level: int = 6) -> bytes:
+    """
+    Comprime o texto para os modos zlib/zstd
+
+    Função de módulo para poder rodar no pool de análise: com textos grandes a
+    compressão sai do event loop e o payload pronto é passado a put().
+    """
+    data = text.encode("utf-8")
+    if mode == "zlib":
+        return zlib.compress(data, level)
+    # O zstandard devolve bytes com a capacidade do pior caso; a cópia libera o excedente
+    return bytes(memoryview(zstandard.ZstdCompressor(level=level).compress(data)))
+
+
+def _encode_timestamp(timestamp: str) -> int:
+    """Converte um timestamp ISO em microssegundos desde a época (sem perdas)"""
+    return (datetime.fromisoformat(timestamp) - _EPOCH) // _MICROSECOND
+
+
+def _decode_timestamp(micros: int) -> str:
+    """Reconstrói o timestamp ISO a partir dos microssegundos armazenados"""
+    return (_EPOCH + micros * _MICROSECOND).isoformat()
+
+
+class TextArena:
+    """Arena append-only que guarda todos os textos em um único buffer UTF-8"""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def add(self, text: str) -> Tuple[int, int]:
+        """Adiciona o texto e retorna (offset, tamanho) em bytes"""
+        data = text.encode("utf-8")
+        offset = len(self._buffer)
+        self._buffer += data
+        return offset, len(data)
+
+    def get(self, offset: int, length: int) -> str:
+        """Lê o texto armazenado em (offset, tamanho)"""
+        return self._buffer[offset:offset + length].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+
+class CachedAnalysis:
+    """Registro compacto de uma análise armazenada"""
+
+    __slots__ = ("_packed", "words", "explanation", "_label", "payload", "version")
+
+    def __init__(self, packed: bytes, words: Tuple[str, ...],
+                 explanation: Optional[str], label: Optional[str] = None,
+                 payload=None, version: Optional[str] = None):
+        self._packed = packed
+        self.words = words
+        self.explanation = explanation
+        # Só é preenchido quando o rótulo não está em SENTIMENT_LABELS
+        self._label = label
+        # Texto comprimido (zlib/zstd) ou (palavras, contagens) no modo index
+        self.payload = payload
+        # Quem produziu a análise (modelo e versão do prompt, classificador local ou palavras-chave)
+        self.version = version
+
+    def _header(self) -> tuple:
+        return _HEADER.unpack_from(self._packed)
+
+    @property
+    def timestamp(self) -> str:
+        return _decode_timestamp(self._header()[0])
+
+    @property
+    def text_span(self) -> Tuple[int, int]:
+        _, offset, length, _, _, _, _ = self._header()
+        return offset, length
+
+    @property
+    def word_count(self) -> int:
+        return self._header()[3]
+
+    @property
+    def sentiment(self) -> str:
+        code = self._header()[4]
+        return self._label if code == _OTHER_SENTIMENT else SENTIMENT_LABELS[code]
+
+    @property
+    def confidence(self) -> Optional[float]:
+        _, _, _, _, _, has_confidence, confidence = self._header()
+        # float32 guarda ~7 dígitos significativos; arredonda para não expor ruído
+        return round(confidence, 6) if has_confidence else None
+
+    @property
+    def frequencies(self) -> List[int]:
+        count = len(self.words)
+        return list(struct.unpack_from(f"<{count}I", self._packed, _HEADER.size))
+
+    @property
+    def word_frequencies(self) -> List[Tuple[str, int]]:
+        """Palavras mais frequentes como pares (palavra, frequência)"""
+        return list(zip(self.words, self.frequencies))
+
+
+class AnalysisStore:
+    """Cache de análises indexado por chave, com o texto guardado conforme o modo"""
+
+    def __init__(self, mode: str = "full", compression_level: int = 6,
+                 normalize: Optional[Callable[[str], str]] = None):
+        if mode not in STORAGE_MODES:
+            raise ValueError(
+                f"Modo de armazenamento inválido: '{mode}'. Use um de: {', '.join(STORAGE_MODES)}"
+            )
+        if mode == "zstd" and zstandard is None:
+            raise ValueError("O modo 'zstd' requer o pacote zstandard (pip install zstandard)")
+        self.mode = mode
+        self.compression_level = compression_level
+        if mode == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+            self._decompressor = zstandard.ZstdDecompressor()
+        self._arena = TextArena()
+        self._records: Dict[str, CachedAnalysis] = {}
+        # Normalização aplicada às palavras do texto nas buscas (e no índice do modo index)
+        self._normalize = normalize
+
+    def _words(self, text: str) -> List[str]:
+        words = tokenize(text)
+        if self._normalize is not None:
+            words = list(map(self._normalize, words))
+        return words
+
+    @property
+    def supports_phrase_search(self) -> bool:
+        return self.mode != "index"
+
+    def _encode_text(self, key: str, text: str, payload=None):
+        """Retorna (offset, tamanho, payload) do texto para o modo configurado"""
+        if self.mode == "full":
+            previous = self._records.get(key)
+            if previous is not None and self.text_of(previous) == text:
+                # Reanálise do mesmo texto: reaproveita o trecho já guardado na arena
+                return (*previous.text_span, None)
+            return (*self._arena.add(text), None)
+        if self.mode == "zlib":
+            return 0, 0, payload or zlib.compress(text.encode("utf-8"), self.compression_level)
+        if self.mode == "zstd":
+            if payload is None:
+                # O zstandard devolve bytes com a capacidade do pior caso; a cópia libera o excedente
+                payload = bytes(memoryview(self._compressor.compress(text.encode("utf-8"))))
+            return 0, 0, payload
+        if payload is None:
+            counts = Counter(self._words(text))
+            payload = (counts.keys(), counts.values())
+        words, counts = payload
+        return 0, 0, (tuple(sys.intern(word) for word in words), array("I", counts))
+
+    def put(self, key: str, text: str, word_count: int,
+            word_frequencies: Sequence[Tuple[str, int]], sentiment: str,
+            confidence: Optional[float], explanation: Optional[str],
+            timestamp: str, payload=None, version: Optional[str] = None) -> CachedAnalysis:
+        """
+        Armazena uma análise e retorna o registro compacto criado
+
+        payload traz o texto já preparado para o modo, calculado fora do event
+        loop: (palavras, contagens) no modo index, com a mesma normalização da
+        busca, ou o texto comprimido por compress_text() nos modos zlib/zstd.
+        Sem ele, o texto é tokenizado ou comprimido aqui.
+        """
+        offset, length, payload = self._encode_text(key, text, payload)
+        code = SENTIMENT_CODES.get(sentiment, _OTHER_SENTIMENT)
+        packed = _HEADER.pack(
+            _encode_timestamp(timestamp), offset, length, word_count, code,
+            confidence is not None, confidence or 0.0,
+        ) + struct.pack(f"<{len(word_frequencies)}I", *(freq for _, freq in word_frequencies))
+        record = CachedAnalysis(
+            packed,
+            tuple(sys.intern(word) for word, _ in word_frequencies),
+            sys.intern(explanation) if explanation else explanation,
+            sentiment if code == _OTHER_SENTIMENT else None,
+            payload,
+            sys.intern(version) if version else version,
+        )
+        self._records[key] = record
+        return record
+
+    def get(self, key: str) -> Optional[CachedAnalysis]:
+        return self._records.get(key)
+
+    def text_of(self, record: CachedAnalysis) -> Optional[str]:
+        """Recupera o texto original de um registro (None no modo index)"""
+        if self.mode == "full":
+            return self._arena.get(*record.text_span)
+        if self.mode == "zlib":
+            return zlib.decompress(record.payload).decode("utf-8")
+        if self.mode == "zstd":
+            return self._decompressor.decompress(record.payload).decode("utf-8")
+        return None
+
+    def count_term(self, record: CachedAnalysis, term: str) -> int:
+        """
+        Conta as ocorrências do termo (já em minúsculas e, com normalização
+        ativada, já normalizado) no texto limpo do registro
+
+        No modo index o texto não existe mais: termos de uma palavra são contados
+        a partir das palavras indexadas com o mesmo resultado; termos com espaço
+        (frases) levantam ValueError em vez de um falso "não encontrado".
+        """
+        if not term:
+            return 0
+        if self.mode != "index":
+            return " ".join(self._words(self.text_of(record))).count(term)
+        if any(char.isspace() for char in term):
+            raise ValueError("Busca por frases não é suportada no modo de armazenamento 'index'")
+        words, counts = record.payload
+        return sum(count * word.count(term) for word, count in zip(words, counts) if term in word)
+
+    def values(self) -> Iterator[CachedAnalysis]:
+        return iter(self._records.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def clear(self):
+        self._arena = TextArena()
+        self._records.clear()
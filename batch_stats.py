@@ -0,0 +1,141 @@
+"""
+Motor vetorizado de estatísticas para lotes de textos
+
+Tokeniza vários textos de uma vez, converte as palavras em ids inteiros de um
+vocabulário compartilhado (limitado: ao passar de max_vocabulary entradas ele é
+descartado e reconstruído no lote seguinte) e calcula contagens e as palavras mais frequentes de
+cada documento com NumPy sobre arrays no estilo CSR (ids concatenados e offsets
+por documento). O resultado é idêntico ao de main.get_word_frequencies,
+inclusive na ordem de desempate (primeira ocorrência no texto).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from text_processing import tokenize
+
+
+class _Vocabulary(dict):
+    """
+    Mapeia palavra -> id, criando ids novos sob demanda
+
+    Com normalização, cada palavra do texto aponta para o id da sua forma
+    normalizada: o próprio vocabulário funciona como memo da normalização.
+    """
+
+    def __init__(self, stopwords: Iterable[str], min_length: int,
+                 normalize: Optional[Callable[[str], str]] = None):
+        super().__init__()
+        self.words: List[str] = []
+        # 1 quando a palavra entra na contagem de frequências com stopwords excluídas
+        self.keep = bytearray()
+        self._stopwords = frozenset(stopwords)
+        self._min_length = min_length
+        self._normalize = normalize
+        self._normalized_ids: Dict[str, int] = {}
+
+    def _new_id(self, word: str) -> int:
+        word_id = len(self.words)
+        self.words.append(word)
+        self.keep.append(word not in self._stopwords and len(word) >= self._min_length)
+        return word_id
+
+    def __missing__(self, word: str) -> int:
+        if self._normalize is None:
+            word_id = self._new_id(word)
+        else:
+            normalized = self._normalize(word)
+            word_id = self._normalized_ids.get(normalized)
+            if word_id is None:
+                word_id = self._normalized_ids[normalized] = self._new_id(normalized)
+        self[word] = word_id
+        return word_id
+
+
+@dataclass
+class BatchStatistics:
+    """Estatísticas de um lote: contagem de palavras e top-k por documento"""
+    word_counts: List[int]
+    most_frequent_words: List[List[Tuple[str, int]]]
+
+
+class BatchStatsEngine:
+    """Calcula contagens e palavras mais frequentes de muitos textos de uma vez"""
+
+    def __init__(self, stopwords: Iterable[str], min_length: int = 3,
+                 normalize: Optional[Callable[[str], str]] = None,
+                 max_vocabulary: int = 100_000):
+        # stopwords devem estar na mesma normalização aplicada às palavras
+        self._vocabulary_args = (frozenset(stopwords), min_length, normalize)
+        self._vocabulary = _Vocabulary(*self._vocabulary_args)
+        # Os textos vêm dos clientes: sem limite, cada palavra nova ficaria para sempre
+        self.max_vocabulary = max_vocabulary
+        self.vocabulary_resets = 0
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocabulary.words)
+
+    def encode(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (ids, offsets): ids concatenados e início de cada documento"""
+        # Só entre lotes: os ids de um lote precisam vir do mesmo vocabulário
+        if len(self._vocabulary) >= self.max_vocabulary:
+            self._vocabulary = _Vocabulary(*self._vocabulary_args)
+            self.vocabulary_resets += 1
+        lookup = self._vocabulary.__getitem__
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        ids: List[int] = []
+        for position, text in enumerate(texts, 1):
+            ids.extend(map(lookup, tokenize(text)))
+            offsets[position] = len(ids)
+        return np.fromiter(ids, dtype=np.int64, count=len(ids)), offsets
+
+    def analyze(self, texts: Sequence[str], top_k: int = 5,
+                exclude_stopwords: bool = True) -> BatchStatistics:
+        """Calcula as estatísticas de todos os textos do lote"""
+        ids, offsets = self.encode(texts)
+        lengths = np.diff(offsets)
+        docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        if exclude_stopwords and len(ids):
+            keep = np.frombuffer(bytes(self._vocabulary.keep), dtype=np.bool_)[ids]
+            ids, docs = ids[keep], docs[keep]
+
+        return BatchStatistics(
+            word_counts=lengths.tolist(),
+            most_frequent_words=self._top_k(ids, docs, len(texts), top_k),
+        )
+
+    def word_frequencies(self, texts: Sequence[str], top_k: int = 5,
+                         exclude_stopwords: bool = True) -> List[List[Tuple[str, int]]]:
+        """Equivalente vetorizado de get_word_frequencies para cada texto"""
+        return self.analyze(texts, top_k, exclude_stopwords).most_frequent_words
+
+    def _top_k(self, ids: np.ndarray, docs: np.ndarray, n_docs: int,
+               top_k: int) -> List[List[Tuple[str, int]]]:
+        result: List[List[Tuple[str, int]]] = [[] for _ in range(n_docs)]
+        if not len(ids) or top_k <= 0:
+            return result
+
+        # Um par (documento, palavra) por chave; np.unique devolve a primeira ocorrência
+        vocabulary_size = self.vocabulary_size
+        keys, first, counts = np.unique(
+            docs * vocabulary_size + ids, return_index=True, return_counts=True
+        )
+        pair_docs = keys // vocabulary_size
+
+        # Ordena por documento, frequência decrescente e primeira ocorrência,
+        # o mesmo desempate de Counter.most_common
+        order = np.lexsort((first, -counts, pair_docs))
+        sorted_docs = pair_docs[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_docs, sorted_docs, side="left")
+        selected = order[rank < top_k]
+
+        words = self._vocabulary.words
+        for doc, word_id, count in zip(pair_docs[selected].tolist(),
+                                       (keys[selected] % vocabulary_size).tolist(),
+                                       counts[selected].tolist()):
+            result[doc].append((words[word_id], count))
+        return result
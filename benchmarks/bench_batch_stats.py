@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark do motor de estatísticas em lote
+
+Compara o laço por texto (clean_text + get_word_frequencies) com
+BatchStatsEngine.analyze sobre o mesmo lote e confere se os resultados coincidem.
+
+Uso: python benchmarks/bench_batch_stats.py [--texts 20000] [--words 60]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_stats import BatchStatsEngine  # noqa: E402
+from main import STOPWORDS, clean_text, get_word_frequencies  # noqa: E402
+
+VOCABULARY = (
+    "o a de que e do da em um para é com não uma os no se na por mais "
+    "projeto api python análise texto sentimento cliente produto entrega prazo "
+    "qualidade suporte sistema erro problema ótimo excelente ruim serviço equipe "
+    "resultado dados modelo resposta rápido lento atendimento usuário integração"
+).split()
+
+
+def make_texts(count: int, words: int, seed: int = 3):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+    return [
+        " ".join(rng.choices(VOCABULARY, weights=weights, k=rng.randint(words // 2, words * 3 // 2)))
+        + f", cliente {i}!"
+        for i in range(count)
+    ]
+
+
+def per_text_loop(texts):
+    counts = [len(clean_text(text).split()) for text in texts]
+    frequencies = [[(wf.word, wf.frequency) for wf in get_word_frequencies(text)] for text in texts]
+    return counts, frequencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--words", type=int, default=60)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts, args.words)
+    engine = BatchStatsEngine(STOPWORDS)
+    engine.analyze(texts[:100])  # aquece o vocabulário compartilhado
+
+    start = time.perf_counter()
+    loop_counts, loop_frequencies = per_text_loop(texts)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statistics = engine.analyze(texts)
+    batch_seconds = time.perf_counter() - start
+
+    assert statistics.word_counts == loop_counts
+    assert statistics.most_frequent_words == loop_frequencies
+
+    print(f"Lote: {args.texts} textos (~{args.words} palavras cada) | resultados idênticos")
+    print(f"  laço por texto: {loop_seconds * 1000:8.1f} ms ({args.texts / loop_seconds:9.0f} textos/s)")
+    print(f"  BatchStatsEngine: {batch_seconds * 1000:6.1f} ms ({args.texts / batch_seconds:9.0f} textos/s)")
+    print(f"  speedup: {loop_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória do cache de análises
+
+Compara os bytes por registro do formato antigo (dict com modelos Pydantic e
+texto bruto) com o registro compacto de analysis_store.AnalysisStore.
+
+Uso: python benchmarks/bench_cache_memory.py [--entries 100000]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis_store import AnalysisStore  # noqa: E402
+from main import SentimentAnalysis, WordFrequency, get_word_frequencies  # noqa: E402
+
+VOCABULARY = (
+    "projeto api python análise texto sentimento cliente produto entrega prazo "
+    "qualidade suporte sistema erro problema ótimo excelente ruim serviço equipe "
+    "resultado dados modelo resposta rápido lento atendimento usuário integração"
+).split()
+SENTIMENTS = [
+    ("positivo", 0.85, "Texto contém palavras positivas, indicando sentimento favorável"),
+    ("negativo", 0.7, "Presença de palavras negativas: 'erro, problema'"),
+    ("neutro", 0.5, "Texto não apresenta palavras claramente positivas ou negativas, mantendo tom neutro"),
+]
+
+
+def make_entries(count: int, seed: int = 42):
+    """Gera análises sintéticas (texto, contagem, frequências, sentimento, timestamp)"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        words = rng.choices(VOCABULARY, k=rng.randint(15, 40))
+        text = f"{' '.join(words)} {i}"
+        frequencies = [(wf.word, wf.frequency) for wf in get_word_frequencies(text)]
+        sentiment, confidence, explanation = rng.choice(SENTIMENTS)
+        timestamp = (start + timedelta(seconds=i, microseconds=i % 997)).isoformat()
+        yield str(i), text, len(words) + 1, frequencies, sentiment, confidence, explanation, timestamp
+
+
+def copy(value: str) -> str:
+    """Cria um novo objeto str com o mesmo conteúdo"""
+    return value.encode("utf-8").decode("utf-8")
+
+
+def measure(builder, entries) -> int:
+    """Retorna os bytes alocados (e mantidos) pelo builder para as entradas"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = builder(entries)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return after - before
+
+
+def build_dict_cache(entries):
+    cache = {}
+    for key, text, word_count, frequencies, sentiment, confidence, explanation, timestamp in entries:
+        cache[key] = {
+            "text": text,
+            "word_count": word_count,
+            "most_frequent_words": [WordFrequency(word=w, frequency=f) for w, f in frequencies],
+            "sentiment_analysis": SentimentAnalysis(
+                sentiment=sentiment, confidence=confidence, explanation=explanation
+            ),
+            "timestamp": timestamp,
+        }
+    return cache
+
+
+def build_compact_store(entries):
+    store = AnalysisStore()
+    for key, text, word_count, frequencies, sentiment, confidence, explanation, timestamp in entries:
+        store.put(key, text, word_count, frequencies, sentiment, confidence, explanation, timestamp)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    entries = list(make_entries(args.entries))
+    text_bytes = sum(len(entry[1].encode("utf-8")) for entry in entries)
+    print(f"Entradas: {args.entries} | texto UTF-8 médio: {text_bytes / args.entries:.1f} bytes")
+
+    results = {}
+    for name, builder in (("dict + Pydantic", build_dict_cache), ("AnalysisStore", build_compact_store)):
+        # Cópias novas de texto e explicação a cada registro, como ocorre na API
+        fresh = (
+            (key, copy(text), count, freqs, sentiment, confidence, copy(explanation), timestamp)
+            for key, text, count, freqs, sentiment, confidence, explanation, timestamp in entries
+        )
+        results[name] = measure(builder, fresh) / args.entries
+        print(f"{name:>16}: {results[name]:8.1f} bytes/registro")
+
+    before, after = results["dict + Pydantic"], results["AnalysisStore"]
+    print(f"Redução: {before / after:.1f}x ({before - after:.0f} bytes/registro a menos)")
+
+
+if __name__ == "__main__":
+    main()
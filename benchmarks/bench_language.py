@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark da detecção de idioma
+
+Mede a latência que a detecção acrescenta a cada requisição (p50/p99, com o
+memo de palavras aquecido e frio) para textos de vários tamanhos e idiomas,
+compara com o custo da contagem de palavras do mesmo texto e confere o
+orçamento de latência.
+
+Uso: python benchmarks/bench_language.py [--runs 2000] [--budget-us 100]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from languages import LANGUAGES, PROFILES, _word_score, detect_language  # noqa: E402
+from text_analysis import compute_text_statistics  # noqa: E402
+
+SIZES = (100, 1_000, 10_000)
+
+
+def make_text(language: str, chars: int, rng: random.Random) -> str:
+    words = PROFILES[language].sample.split()
+    text, length = [], 0
+    while length < chars:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return " ".join(text)[:chars]
+
+
+def timings(fn, texts, clear=None):
+    samples = []
+    for text in texts:
+        if clear:
+            clear()
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2_000)
+    parser.add_argument("--budget-us", type=float, default=100.0,
+                        help="p99 máximo da detecção com memo aquecido (µs)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    worst = 0.0
+    print(f"{'tamanho':>8} | {'aquecido p50/p99':>17} | {'frio p50/p99':>15} | {'contagem p50':>12} | acerto")
+    for size in SIZES:
+        texts = [(language, make_text(language, size, rng))
+                 for _ in range(args.runs // len(LANGUAGES)) for language in LANGUAGES]
+        plain = [text for _, text in texts]
+        hits = sum(detect_language(text) == language for language, text in texts)
+        warm = timings(detect_language, plain)
+        cold = timings(detect_language, plain[:200], clear=_word_score.cache_clear)
+        counting = timings(compute_text_statistics, plain)
+        worst = max(worst, warm[1])
+        print(f"{size:>8} | {warm[0]:7.1f} / {warm[1]:7.1f} | {cold[0]:6.1f} / {cold[1]:6.1f} | "
+              f"{counting[0]:12.1f} | {hits / len(texts):.1%}")
+
+    status = "dentro do" if worst <= args.budget_us else "ACIMA DO"
+    print(f"p99 aquecido máximo: {worst:.1f} µs ({status} orçamento de {args.budget_us:.0f} µs)")
+    if worst > args.budget_us:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark da normalização de palavras (acentos e stemmer leve)
+
+Mede a vazão da contagem de frequências, do sentimento local e do motor em
+lote com e sem normalização, sobre textos com vocabulário Zipfiano, e a taxa
+de acerto do memo de normalização.
+
+Uso: python benchmarks/bench_normalization.py [--texts 5000] [--words 80]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main as api  # noqa: E402
+import text_analysis  # noqa: E402
+
+VOCABULARY = (
+    "o a de que e é do da em um para com não uma os no se na por mais "
+    "problema problemas erro erros serviço serviços ação ações cliente clientes "
+    "produto produtos entrega entregas prazo prazos qualidade suporte sistema sistemas "
+    "ótimo ótimos excelente ruim ruins atendimento usuário usuários integração integrações "
+    "relatório relatórios papéis papel função funções solução soluções bug bugs"
+).split()
+
+
+def make_texts(count: int, words: int, seed: int = 5):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+    # Um sufixo por texto simula a cauda longa de palavras raras
+    return [
+        " ".join(rng.choices(VOCABULARY, weights=weights, k=words)) + f" pedido{i}"
+        for i in range(count)
+    ]
+
+
+def configure(enabled: bool):
+    api.text_normalizer = text_analysis.configure_normalization(enabled)
+    api._batch_engines.clear()
+    return api.text_normalizer
+
+
+def measure(texts):
+    start = time.perf_counter()
+    for text in texts:
+        text_analysis.compute_text_statistics(text)
+    statistics = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        text_analysis.compute_simple_sentiment(text)
+    sentiment = time.perf_counter() - start
+
+    engine = api.get_batch_engine()
+    engine.analyze(texts[:50])
+    start = time.perf_counter()
+    engine.analyze(texts)
+    batch = time.perf_counter() - start
+    return statistics, sentiment, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=5_000)
+    parser.add_argument("--words", type=int, default=80)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts, args.words)
+    tokens = args.texts * (args.words + 1)
+    print(f"{args.texts} textos, {tokens} palavras (textos/s)")
+    print(f"{'normalização':>13} | {'frequências':>11} | {'sentimento':>10} | {'lote':>9}")
+    for name, enabled in (("desligada", False), ("ligada", True)):
+        normalizer = configure(enabled)
+        measure(texts[:200])  # aquece o memo e os vocabulários
+        statistics, sentiment, batch = measure(texts)
+        print(f"{name:>13} | {args.texts / statistics:11.0f} | {args.texts / sentiment:10.0f} | "
+              f"{args.texts / batch:9.0f}")
+        if normalizer:
+            print(f"memo: {normalizer.metrics()}")
+    configure(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de requisições por segundo de /analyze-text com textos pequenos
+
+Chama a aplicação ASGI diretamente (sem rede e sem cliente HTTP) e sem API key
+do Gemini, de modo que o tempo medido é o da própria API: roteamento,
+validação, análise, cache e serialização da resposta.
+
+Uso: python benchmarks/bench_responses.py [--requests 20000] [--concurrency 16] [--app-dir .]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TEXTS = [
+    "Este projeto é incrível e muito bem feito!",
+    "O atendimento foi péssimo, cheio de problemas.",
+    "A entrega chegou no prazo combinado.",
+    "Python é uma linguagem de programação fantástica.",
+    "Infelizmente o sistema não está funcionando.",
+]
+
+
+async def post(app, path: str, body: bytes) -> int:
+    """Executa uma requisição POST diretamente na aplicação ASGI e retorna o status"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def run(app, total: int, concurrency: int) -> float:
+    rng = random.Random(1)
+    bodies = [json.dumps({"text": f"{rng.choice(TEXTS)} #{i}"}).encode() for i in range(total)]
+    queue = iter(bodies)
+
+    async def worker():
+        for body in queue:
+            assert await post(app, "/analyze-text", body) == 200
+
+    # Aquecimento
+    for body in bodies[:200]:
+        await post(app, "/analyze-text", body)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--app-dir", type=Path, default=ROOT)
+    args = parser.parse_args()
+
+    os.environ["GEMINI_API_KEY"] = ""
+    sys.path.insert(0, str(args.app_dir.resolve()))
+    import main as app_module
+    logging.disable(logging.CRITICAL)
+
+    elapsed = asyncio.run(run(app_module.app, args.requests, args.concurrency))
+    print(f"{args.app_dir.resolve()}: {args.requests} requisições, concorrência {args.concurrency}")
+    print(f"  {args.requests / elapsed:,.0f} req/s ({elapsed * 1e6 / args.requests:.0f} µs/req)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do classificador local de sentimento
+
+Compara latência e concordância do classificador local com a análise por
+palavras-chave e, com GEMINI_API_KEY definida e --gemini-sample > 0, com o
+Gemini. Usa os pesos de --model ou, se o arquivo não existir, treina um modelo
+com o conjunto de --data.
+
+Uso: python benchmarks/bench_sentiment_model.py [--data data/sentiment_seed.jsonl]
+     [--model models/sentiment.npz] [--batch 1000] [--gemini-sample 0]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from text_analysis import compute_simple_sentiment  # noqa: E402
+from sentiment_model import SentimentClassifier  # noqa: E402
+from train_sentiment_model import load_dataset  # noqa: E402
+
+
+def per_text_us(fn, texts, repeat: int = 3) -> float:
+    samples = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def agreement(first, second) -> float:
+    pairs = list(zip(first, second))
+    return sum(a == b for a, b in pairs) / len(pairs)
+
+
+async def gemini_labels(texts):
+    from gemini_provider import DEFAULT_MODEL, GeminiSentimentProvider
+    provider = GeminiSentimentProvider.from_api_key(os.environ["GEMINI_API_KEY"], os.getenv("GEMINI_MODEL", DEFAULT_MODEL))
+    labels, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        sentiment, _, _ = await provider.analyze(text)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        labels.append(sentiment)
+    return labels, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", type=Path, default=ROOT / "data" / "sentiment_seed.jsonl")
+    parser.add_argument("--model", type=Path, default=ROOT / "models" / "sentiment.npz")
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--gemini-sample", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, labels = load_dataset(args.data)
+    if args.model.exists():
+        model = SentimentClassifier.load(str(args.model))
+    else:
+        print(f"{args.model} não encontrado: treinando com {args.data} (concordância com os rótulos é no treino)")
+        model = SentimentClassifier.train(texts, labels)
+
+    batch = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    model.predict(batch[:10])
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_us = (time.perf_counter() - start) * 1e6 / len(batch)
+
+    print(f"Modelo {model.version} | {len(texts)} exemplos rotulados")
+    print(f"{'caminho':>24} | {'µs/texto':>9}")
+    print(f"{'modelo, texto a texto':>24} | {per_text_us(lambda text: model.predict([text]), texts):9.1f}")
+    print(f"{f'modelo, lote de {len(batch)}':>24} | {batch_us:9.1f}")
+    print(f"{'palavras-chave':>24} | {per_text_us(compute_simple_sentiment, texts):9.1f}")
+
+    predictions = model.predict(texts)
+    model_labels = [label for label, _ in predictions]
+    keyword_labels = [compute_simple_sentiment(text)[0] for text in texts]
+    confident = [confidence >= args.threshold for _, confidence in predictions]
+    print(f"Concordância com os rótulos: modelo {agreement(model_labels, labels):.1%}, "
+          f"palavras-chave {agreement(keyword_labels, labels):.1%}")
+    print(f"Concordância modelo x palavras-chave: {agreement(model_labels, keyword_labels):.1%}")
+    print(f"Respondidos localmente com confiança >= {args.threshold}: {sum(confident) / len(texts):.1%}")
+
+    if args.gemini_sample and os.getenv("GEMINI_API_KEY"):
+        sample = texts[:args.gemini_sample]
+        gemini, gemini_us = asyncio.run(gemini_labels(sample))
+        print(f"{'Gemini':>24} | {gemini_us:9.1f}")
+        print(f"Concordância com o Gemini ({len(sample)} textos): modelo {agreement(model_labels, gemini):.1%}, "
+              f"palavras-chave {agreement(keyword_labels, gemini):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização a frio
+
+Mede, em processos Python novos, o tempo de importação de main, o tempo até a
+aplicação ficar pronta (lifespan com warm-up) e o tempo até a primeira resposta.
+
+Uso: python benchmarks/bench_startup.py [--runs 5] [--app-dir .]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executado em cada processo filho; o relógio começa antes de qualquer importação da aplicação
+CHILD = r"""
+import time
+start = time.perf_counter()
+import sys, json, logging
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    if sys.argv[2] == "analyze":
+        response = client.post("/analyze-text", json={"text": "Primeira análise: o serviço está ótimo!"})
+    else:
+        response = client.get("/health")
+    first = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({"import": imported - start, "ready": ready - start, "first_response": first - start}))
+"""
+
+SCENARIOS = {
+    # Sem chave: a primeira análise usa o caminho local
+    "sem API key": ({"GEMINI_API_KEY": ""}, "analyze"),
+    # Com chave: o warm-up cria o modelo; /health evita depender da rede
+    "com API key": ({"GEMINI_API_KEY": "chave-de-benchmark"}, "health"),
+}
+
+
+def run_once(app_dir: Path, env_overrides: dict, request: str) -> dict:
+    env = {**os.environ, **env_overrides, "PYTHONWARNINGS": "ignore"}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, str(app_dir), request],
+        env=env, cwd=app_dir, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", type=Path, default=ROOT)
+    args = parser.parse_args()
+
+    app_dir = args.app_dir.resolve()
+    print(f"Aplicação: {app_dir} | {args.runs} execuções por cenário (mediana, ms)")
+    print(f"{'cenário':>12} | {'import':>7} | {'pronto':>7} | {'1ª resposta':>11}")
+    for name, (env_overrides, request) in SCENARIOS.items():
+        runs = [run_once(app_dir, env_overrides, request) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+        print(f"{name:>12} | {median['import']:7.0f} | {median['ready']:7.0f} | {median['first_response']:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
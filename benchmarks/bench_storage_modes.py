@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos modos de armazenamento do cache de análises
+
+Para cada modo (full, zlib, zstd, index) mede a memória ocupada por documentos
+longos e a latência da busca de termos sobre todos os registros.
+
+Uso: python benchmarks/bench_storage_modes.py [--documents 2000] [--words 2000]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis_store import STORAGE_MODES, AnalysisStore, zstandard  # noqa: E402
+
+VOCABULARY = (
+    "projeto api python análise texto sentimento cliente produto entrega prazo "
+    "qualidade suporte sistema erro problema ótimo excelente ruim serviço equipe "
+    "resultado dados modelo resposta rápido lento atendimento usuário integração "
+    "contrato relatório reunião pedido pagamento fatura cadastro acesso senha"
+).split()
+TERMS = ["python", "erro", "atendimento", "inexistente", "pag"]
+
+
+def make_documents(count: int, words: int, seed: int = 7):
+    """Gera documentos longos com distribuição de Zipf sobre o vocabulário"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+    for i in range(count):
+        tokens = rng.choices(VOCABULARY, weights=weights, k=words)
+        # Pontuação a cada frase, como em textos reais
+        sentences = [" ".join(tokens[j:j + 12]).capitalize() + "." for j in range(0, words, 12)]
+        yield f"doc{i}", f"Documento {i}. " + " ".join(sentences)
+
+
+def build(mode: str, documents):
+    store = AnalysisStore(mode=mode)
+    for key, text in documents:
+        store.put(key, text, 0, [], "neutro", 0.5, None, "2026-01-01T00:00:00")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = list(make_documents(args.documents, args.words))
+    raw_bytes = sum(len(text.encode("utf-8")) for _, text in documents)
+    print(f"Documentos: {args.documents} x {args.words} palavras | "
+          f"texto UTF-8: {raw_bytes / 2**20:.1f} MiB")
+    print(f"{'modo':>6} | {'memória (MiB)':>13} | {'vs full':>7} | {'busca (ms/termo)':>16}")
+
+    baseline = None
+    for mode in STORAGE_MODES:
+        if mode == "zstd" and zstandard is None:
+            print(f"{mode:>6} | pacote zstandard não instalado")
+            continue
+        gc.collect()
+        tracemalloc.start()
+        store = build(mode, documents)
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for term in TERMS:
+                sum(store.count_term(record, term) for record in store.values())
+        latency = (time.perf_counter() - start) * 1000 / (args.repeat * len(TERMS))
+
+        baseline = baseline or memory
+        print(f"{mode:>6} | {memory / 2**20:13.2f} | {memory / baseline:6.1%} | {latency:16.2f}")
+        del store
+
+
+if __name__ == "__main__":
+    main()
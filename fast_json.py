@@ -0,0 +1,32 @@
+"""
+Serialização JSON rápida para respostas montadas com estruturas simples
+
+Usa orjson quando disponível e cai para o módulo json da biblioteca padrão.
+As respostas são serializadas uma única vez, sem passar novamente pelos
+modelos Pydantic.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa o conteúdo em JSON UTF-8"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Resposta JSON serializada com orjson, sem validação pelo response_model"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
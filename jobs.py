@@ -0,0 +1,341 @@
+"""
+Jobs assíncronos de análise
+
+POST /jobs grava o job em uma fila persistente (SQLite) e devolve o id
+imediatamente; um pool de workers asyncio processa a fila e grava o resultado.
+A fila é a própria tabela: vários processos podem compartilhar o mesmo arquivo.
+Cada worker reivindica um job com um UPDATE condicional (status, dono e prazo
+do lease), renova o lease enquanto o processa e só grava o resultado se ainda
+for o dono. Jobs em execução cujo lease expirou (processo que caiu) voltam a
+ser reivindicáveis; jobs com lease válido de outro processo nunca são tocados.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Fila de jobs cheia: o cliente deve tentar novamente mais tarde"""
+
+
+class JobStore:
+    """Persistência dos jobs em SQLite"""
+
+    def __init__(self, path: str = "jobs.db", timeout: float = 0.05):
+        # As chamadas rodam no event loop: com o banco travado por outro processo,
+        # espera no máximo timeout segundos e falha (o worker tenta de novo depois)
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            # WAL com synchronous=NORMAL: commits baratos sem arriscar corromper o banco
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                lease_until REAL
+            )
+        """)
+        # Bancos criados antes dos leases
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._db.commit()
+
+    def create(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        return job_id
+
+    def claim(self, owner: str, lease: float) -> Optional[str]:
+        """
+        Reivindica o job mais antigo na fila (ou em execução com lease expirado)
+
+        O UPDATE só acontece se o job ainda estiver disponível, então dois
+        workers, no mesmo processo ou não, nunca ficam com o mesmo job.
+        """
+        while True:
+            now = time.time()
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, updated_at = ? "
+                    "WHERE id = ? AND (status = ? OR (status = ? AND lease_until < ?))",
+                    (RUNNING, owner, now + lease, now, row["id"], QUEUED, RUNNING, now),
+                )
+            if cursor.rowcount == 1:
+                return row["id"]
+            # Outro worker levou o job entre o SELECT e o UPDATE: tenta o próximo
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Estende o lease; False se o job não pertence mais a owner"""
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + lease, job_id, owner, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, owner: str, status: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> bool:
+        """Grava o resultado se owner ainda for o dono do job"""
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id, owner, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str):
+        """Devolve à fila um job interrompido por este dono"""
+        self.finish(job_id, owner, QUEUED)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+
+    def payload(self, job_id: str) -> Dict[str, Any]:
+        row = self._db.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["payload"])
+
+    def queued(self) -> int:
+        """Jobs aguardando na fila, somando todos os processos"""
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def expired(self) -> int:
+        """Jobs em execução cujo lease expirou"""
+        return self._db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_until < ?", (RUNNING, time.time())
+        ).fetchone()[0]
+
+    def purge_finished(self, older_than: float) -> int:
+        """Remove jobs concluídos há mais de older_than segundos"""
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - older_than),
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self._db.close()
+
+
+class JobManager:
+    """Fila limitada de jobs em SQLite processada por um pool de workers asyncio"""
+
+    def __init__(self, store: JobStore, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 workers: int = 4, max_queue: int = 1000, retention: float = 24 * 3600,
+                 lease: float = 300.0, poll_interval: float = 0.5, retry_backoff: float = 1.0,
+                 purge_interval: float = 600.0):
+        self.store = store
+        self._handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.purged = 0
+        self.store_errors = 0
+        # Identifica este processo nos jobs que ele reivindica
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> Optional[int]:
+        try:
+            return self.store.queued()
+        except sqlite3.Error:
+            return None
+
+    async def start(self):
+        """Inicia os workers; jobs na fila e leases expirados são reivindicados por eles"""
+        self._purge()
+        expired = self.store.expired()
+        if expired:
+            logger.info(f"Jobs: {expired} com lease expirado serão retomados")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Grava o job na fila, retornando o id"""
+        if self._wakeup is None:
+            raise RuntimeError("JobManager não iniciado")
+        try:
+            if self.store.queued() >= self.max_queue:
+                raise JobQueueFull(f"Fila de jobs cheia ({self.max_queue} jobs aguardando)")
+            job_id = self.store.create(payload)
+        except sqlite3.Error as e:
+            self.store_errors += 1
+            raise JobQueueFull(f"Fila de jobs indisponível: {e}") from e
+        # Acorda os workers locais; os de outros processos encontram o job no próximo poll
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _purge(self):
+        """Remove jobs concluídos além da retenção, no máximo uma vez por purge_interval"""
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        try:
+            purged = self.store.purge_finished(self.retention)
+        except Exception as e:
+            self.store_errors += 1
+            logger.error(f"Jobs: erro ao remover jobs antigos: {e}")
+            return
+        self.purged += purged
+        if purged:
+            logger.info(f"Jobs: {purged} jobs concluídos há mais de {self.retention / 3600:g}h removidos")
+
+    async def _worker(self):
+        while True:
+            # Com o processo no ar por dias, o arquivo não cresce sem limite
+            self._purge()
+            try:
+                job_id = self.store.claim(self.owner, self.lease)
+            except Exception as e:
+                # Banco travado por outro processo, disco cheio...: o worker continua vivo
+                self.store_errors += 1
+                logger.error(f"Jobs: erro ao reivindicar job, nova tentativa em {self.retry_backoff}s: {e}")
+                await asyncio.sleep(self.retry_backoff)
+                continue
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job_id)
+
+    async def _run(self, job_id: str):
+        try:
+            payload = self.store.payload(job_id)
+        except Exception as e:
+            self.store_errors += 1
+            logger.error(f"Jobs: erro ao ler o job {job_id}, nova tentativa em {self.retry_backoff}s: {e}")
+            self._release(job_id)
+            await asyncio.sleep(self.retry_backoff)
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self._handler(payload)
+            status, error = DONE, None
+        except asyncio.CancelledError:
+            # Desligamento: o job volta para a fila para outro worker
+            heartbeat.cancel()
+            self._release(job_id)
+            raise
+        except Exception as e:
+            logger.error(f"Erro no job {job_id}: {e}")
+            result, status, error = None, FAILED, str(e)
+        try:
+            await self._finish(job_id, status, result, error)
+        finally:
+            heartbeat.cancel()
+
+    def _release(self, job_id: str):
+        try:
+            self.store.release(job_id, self.owner)
+        except Exception as e:
+            self.store_errors += 1
+            logger.error(f"Jobs: erro ao devolver o job {job_id} à fila; volta quando o lease expirar: {e}")
+
+    async def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str],
+                      attempts: int = 3):
+        """Grava o resultado, tentando de novo em erros do banco"""
+        for attempt in range(1, attempts + 1):
+            try:
+                finished = self.store.finish(job_id, self.owner, status, result=result, error=error)
+            except Exception as e:
+                self.store_errors += 1
+                logger.error(f"Jobs: erro ao gravar o job {job_id} (tentativa {attempt}/{attempts}): {e}")
+                if attempt < attempts:
+                    await asyncio.sleep(self.retry_backoff)
+                continue
+            if not finished:
+                logger.warning(f"Job {job_id} perdeu o lease antes de terminar; resultado descartado")
+            return
+        # Sem gravar, o job continua "running" e é refeito quando o lease expirar
+        logger.error(f"Jobs: resultado do job {job_id} descartado; será refeito após o lease")
+
+    async def _heartbeat(self, job_id: str):
+        """Renova o lease enquanto o job está em execução"""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not self.store.renew(job_id, self.owner, self.lease):
+                    return
+            except Exception as e:
+                # Próxima renovação ainda cabe no lease
+                self.store_errors += 1
+                logger.warning(f"Jobs: erro ao renovar o lease do job {job_id}: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth,
+            "lease_seconds": self.lease,
+            "store_errors": self.store_errors,
+            "purged": self.purged,
+        }
@@ -0,0 +1,233 @@
+"""
+Idiomas suportados: detecção, stopwords e léxicos de sentimento
+
+Cada idioma tem um perfil com stopwords, palavras positivas/negativas e padrões
+negativos, montado uma única vez na importação. A detecção usa um modelo de
+trigramas de caracteres (log-probabilidades por idioma, com suavização de
+Laplace) estimado de um pequeno corpus de referência embutido. O texto é
+avaliado palavra a palavra, só na amostra inicial, e a pontuação de cada
+palavra fica em um memo limitado: como o vocabulário segue a lei de Zipf, quase
+todas as palavras de uma requisição já foram vistas antes.
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from text_processing import tokenize
+
+DEFAULT_LANGUAGE = "pt"
+
+# Só o início do texto é usado na detecção: o custo não cresce com o tamanho do texto
+DETECTION_SAMPLE_CHARS = 500
+
+# Diferença mínima (log-verossimilhança) entre o melhor e o segundo idioma;
+# abaixo dela o texto é ambíguo e fica com o idioma padrão
+DETECTION_MIN_MARGIN = 1.0
+
+
+@dataclass(frozen=True)
+class LanguageProfile:
+    """Tabelas de um idioma usadas na contagem de palavras e no sentimento local"""
+    code: str
+    stopwords: FrozenSet[str]
+    positive_words: FrozenSet[str]
+    negative_words: FrozenSet[str]
+    negative_patterns: Tuple[str, ...]
+    # Corpus de referência do modelo de trigramas (além das stopwords)
+    sample: str
+
+
+PROFILES: Dict[str, LanguageProfile] = {
+    profile.code: profile for profile in (
+        LanguageProfile(
+            code="pt",
+            stopwords=frozenset({
+                'a', 'o', 'e', 'é', 'de', 'do', 'da', 'em', 'um', 'uma', 'para', 'com', 'não',
+                'na', 'no', 'se', 'que', 'por', 'mais', 'das', 'dos', 'como', 'mas', 'foi',
+                'ao', 'ele', 'sua', 'ou', 'ser', 'seu', 'à', 'até', 'pelo', 'pela', 'são',
+                'aos', 'às', 'isso', 'ela', 'entre', 'era', 'depois', 'sem', 'mesmo',
+                'quando', 'muito', 'nos', 'eu', 'você', 'eles', 'elas', 'já', 'só', 'tem',
+                'pode', 'onde', 'vai', 'ainda', 'essa', 'este', 'esta', 'esse', 'todas',
+                'todos', 'sobre', 'antes', 'sempre', 'bem', 'também'
+            }),
+            positive_words=frozenset({
+                'bom', 'ótimo', 'excelente', 'maravilhoso', 'fantástico', 'incrível',
+                'adorável', 'perfeito', 'feliz', 'alegre', 'satisfeito', 'contente',
+                'amor', 'sucesso', 'vitória', 'ganhar', 'positivo', 'bonito'
+            }),
+            negative_words=frozenset({
+                'ruim', 'péssimo', 'terrível', 'horrível', 'triste', 'deprimido',
+                'raiva', 'ódio', 'problema', 'problemas', 'erro', 'erros', 'falha', 'defeito', 'negativo',
+                'impossível', 'difícil', 'complicado', 'frustrado', 'chateado', 'infelizmente',
+                'não', 'bugs', 'bug', 'urgentemente', 'resolvidos', 'esperado', 'funcionando'
+            }),
+            negative_patterns=(
+                "não está funcionando",
+                "não funciona",
+                "cheio de problemas",
+                "muitos problemas",
+                "cheio de bugs",
+                "muitos bugs",
+            ),
+            sample=(
+                "O atendimento foi muito bom e a entrega chegou antes do prazo. "
+                "Não gostei da embalagem, mas o produto está funcionando sem problemas. "
+                "Eu acho que a nova versão do aplicativo ficou mais rápida e bonita, "
+                "porém ainda há erros na tela de pagamento. Você pode verificar isso? "
+                "Ontem tentei entrar no sistema e não consegui, então liguei para o suporte. "
+                "A equipe respondeu com atenção e resolveu a situação em poucos minutos. "
+                "Estamos satisfeitos com a qualidade do serviço e vamos recomendar a empresa. "
+                "As informações da conta não aparecem corretamente depois da atualização. "
+                "Gostaria de saber quando a função de exportação estará disponível."
+            ),
+        ),
+        LanguageProfile(
+            code="en",
+            stopwords=frozenset({
+                'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'any', 'can', 'had',
+                'her', 'was', 'one', 'our', 'out', 'has', 'have', 'his', 'him', 'how', 'its',
+                'may', 'who', 'did', 'get', 'got', 'this', 'that', 'with', 'they', 'them',
+                'from', 'were', 'been', 'there', 'their', 'what', 'when', 'which', 'will',
+                'would', 'could', 'should', 'about', 'into', 'than', 'then', 'also', 'just',
+                'some', 'more', 'very', 'only', 'your', 'yours', 'she', 'these',
+                'those', 'because', 'while', 'where', 'after', 'before', 'over', 'such',
+                'does', 'doesn', 'don', 'didn', 'isn', 'wasn', 'aren', 'won', 'being'
+            }),
+            positive_words=frozenset({
+                'good', 'great', 'excellent', 'wonderful', 'fantastic', 'amazing',
+                'lovely', 'perfect', 'happy', 'glad', 'satisfied', 'pleased',
+                'love', 'success', 'win', 'positive', 'beautiful', 'awesome'
+            }),
+            negative_words=frozenset({
+                'bad', 'awful', 'terrible', 'horrible', 'sad', 'depressed',
+                'anger', 'hate', 'problem', 'problems', 'error', 'errors', 'failure', 'defect',
+                'negative', 'impossible', 'difficult', 'complicated', 'frustrated', 'upset',
+                'unfortunately', 'not', 'bug', 'bugs', 'broken', 'urgently'
+            }),
+            negative_patterns=(
+                "not working",
+                "does not work",
+                "full of problems",
+                "too many problems",
+                "full of bugs",
+                "too many bugs",
+            ),
+            sample=(
+                "The support team was very helpful and the delivery arrived before the deadline. "
+                "I did not like the packaging, but the product is working without any problems. "
+                "I think the new version of the app is faster and looks better, "
+                "however there are still errors on the payment screen. Could you check this? "
+                "Yesterday I tried to log into the system and could not, so I called support. "
+                "They answered quickly and fixed the issue within a few minutes. "
+                "We are satisfied with the quality of the service and will recommend the company. "
+                "The account information does not show correctly after the update. "
+                "I would like to know when the export feature will be available."
+            ),
+        ),
+        LanguageProfile(
+            code="es",
+            stopwords=frozenset({
+                'el', 'la', 'lo', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o', 'de',
+                'del', 'al', 'en', 'a', 'con', 'por', 'para', 'sin', 'que', 'se', 'no', 'es',
+                'son', 'fue', 'era', 'muy', 'más', 'pero', 'como', 'su', 'sus', 'le', 'les',
+                'me', 'mi', 'mis', 'te', 'tu', 'yo', 'él', 'ella', 'ellos', 'ellas', 'ya',
+                'este', 'esta', 'esto', 'ese', 'esa', 'eso', 'hay', 'ha', 'han', 'cuando',
+                'donde', 'también', 'todo', 'todos', 'todas', 'sobre', 'entre', 'desde',
+                'hasta', 'porque', 'siempre', 'bien', 'aún', 'todavía', 'nos', 'usted'
+            }),
+            positive_words=frozenset({
+                'bueno', 'buena', 'excelente', 'maravilloso', 'fantástico', 'increíble',
+                'adorable', 'perfecto', 'feliz', 'alegre', 'satisfecho', 'contento',
+                'amor', 'éxito', 'victoria', 'ganar', 'positivo', 'bonito'
+            }),
+            negative_words=frozenset({
+                'malo', 'mala', 'pésimo', 'terrible', 'horrible', 'triste', 'deprimido',
+                'rabia', 'odio', 'problema', 'problemas', 'error', 'errores', 'fallo', 'defecto',
+                'negativo', 'imposible', 'difícil', 'complicado', 'frustrado', 'molesto',
+                'desafortunadamente', 'no', 'bug', 'bugs', 'urgentemente', 'funciona'
+            }),
+            negative_patterns=(
+                "no está funcionando",
+                "no funciona",
+                "lleno de problemas",
+                "muchos problemas",
+                "lleno de bugs",
+                "muchos bugs",
+            ),
+            sample=(
+                "El equipo de soporte fue muy amable y la entrega llegó antes del plazo. "
+                "No me gustó el embalaje, pero el producto está funcionando sin problemas. "
+                "Creo que la nueva versión de la aplicación es más rápida y bonita, "
+                "sin embargo todavía hay errores en la pantalla de pago. ¿Usted puede revisar esto? "
+                "Ayer intenté entrar en el sistema y no pude, así que llamé al servicio técnico. "
+                "Ellos respondieron con atención y resolvieron la situación en pocos minutos. "
+                "Estamos satisfechos con la calidad del servicio y vamos a recomendar la empresa. "
+                "La información de la cuenta no aparece correctamente después de la actualización. "
+                "Me gustaría saber cuándo estará disponible la función de exportación."
+            ),
+        ),
+    )
+}
+
+LANGUAGES: Tuple[str, ...] = tuple(PROFILES)
+
+
+def _word_trigrams(word: str):
+    padded = f" {word} "
+    return (padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _build_trigram_table() -> Dict[str, Tuple[float, ...]]:
+    """Trigrama -> log-probabilidade em cada idioma (na ordem de LANGUAGES)"""
+    counts = []
+    for code in LANGUAGES:
+        profile = PROFILES[code]
+        language_counts: Dict[str, int] = {}
+        for word in tokenize(profile.sample + " " + " ".join(sorted(profile.stopwords))):
+            for trigram in _word_trigrams(word):
+                language_counts[trigram] = language_counts.get(trigram, 0) + 1
+        counts.append(language_counts)
+
+    vocabulary = set().union(*counts)
+    # Denominador da suavização de Laplace de cada idioma, calculado uma vez
+    totals = [sum(language_counts.values()) + len(vocabulary) for language_counts in counts]
+    pairs = list(zip(counts, totals))
+    table: Dict[str, Tuple[float, ...]] = {}
+    for trigram in vocabulary:
+        table[trigram] = tuple(
+            math.log((language_counts.get(trigram, 0) + 1) / total) for language_counts, total in pairs
+        )
+    return table
+
+
+_TRIGRAMS = _build_trigram_table()
+_ZERO_SCORE = (0.0,) * len(LANGUAGES)
+
+
+@lru_cache(maxsize=8192)
+def _word_score(word: str) -> Tuple[float, ...]:
+    """Log-verossimilhança da palavra em cada idioma (trigramas desconhecidos são ignorados)"""
+    score = _ZERO_SCORE
+    for trigram in _word_trigrams(word):
+        log_probs = _TRIGRAMS.get(trigram)
+        if log_probs is not None:
+            score = tuple(map(float.__add__, score, log_probs))
+    return score
+
+
+def detect_language(text: str) -> str:
+    """Detecta o idioma do texto; textos ambíguos ficam com o idioma padrão"""
+    # Soma as pontuações por idioma (colunas) de todas as palavras da amostra
+    scores = map(sum, zip(_ZERO_SCORE, *map(_word_score, tokenize(text[:DETECTION_SAMPLE_CHARS]))))
+    ranked = sorted(zip(scores, LANGUAGES), reverse=True)
+    (best_score, best), (second_score, _) = ranked[0], ranked[1]
+    if best_score - second_score < DETECTION_MIN_MARGIN:
+        return DEFAULT_LANGUAGE
+    return best
+
+
+def get_profile(language: Optional[str] = None) -> LanguageProfile:
+    """Perfil do idioma informado (idioma padrão quando None)"""
+    return PROFILES[language or DEFAULT_LANGUAGE]
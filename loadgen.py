@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga com relatório de percentis de latência
+
+Gera tráfego sintético em português (mistura de /analyze-text e /search-term,
+fração de textos repetidos e tamanhos com distribuição log-normal) e envia as
+requisições com httpx assíncrono a uma taxa de chegada fixa (malha aberta): uma
+nova requisição sai a cada 1/rate segundos, esteja o servidor respondendo ou
+não, e a latência é medida a partir do instante agendado, de modo que a fila
+formada por um servidor lento entra nos números.
+
+Sem --url, a aplicação roda no mesmo processo (httpx.ASGITransport) com um
+Gemini simulado que responde após --stub-latency-ms; com --url, o alvo é um
+servidor já em execução. O relatório sai em JSON; --max-p99-ms e
+--max-error-rate fazem o comando terminar com código 1 quando ultrapassados.
+
+Uso: python loadgen.py [--url http://localhost:8000] [--rate 50] [--duration 30]
+     [--search-ratio 0.2] [--duplicate-ratio 0.3] [--words-median 40]
+     [--max-p99-ms 500] [--max-error-rate 0.01] [--output relatorio.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+ANALYZE_PATH = "/analyze-text"
+SEARCH_PATH = "/search-term"
+
+SUBJECTS = [
+    "O produto", "O atendimento", "A entrega", "O aplicativo", "A equipe de suporte",
+    "O sistema", "A nova versão", "O pedido", "A loja", "O serviço", "A plataforma",
+    "O relatório", "A instalação", "O pagamento", "A documentação",
+]
+
+PREDICATES = {
+    "positivo": [
+        "funcionou muito bem desde o primeiro dia", "é excelente e fácil de usar",
+        "superou todas as minhas expectativas", "chegou antes do prazo e em ótimo estado",
+        "resolveu o problema de forma rápida e eficiente", "é fantástico, recomendo a todos",
+        "ficou incrível depois da atualização", "tem uma qualidade maravilhosa",
+    ],
+    "negativo": [
+        "apresentou defeito logo na primeira semana", "é péssimo e cheio de falhas",
+        "não funciona como prometido", "atrasou mais de dez dias sem nenhuma explicação",
+        "deixou muito a desejar", "travou várias vezes durante o uso",
+        "é horrível e a troca foi complicada", "veio quebrado e ninguém respondeu",
+    ],
+    "neutro": [
+        "foi entregue na terça-feira", "tem três opções de configuração",
+        "usa o mesmo cadastro do site", "passou por uma revisão no mês passado",
+        "está disponível para download", "segue o processo padrão da empresa",
+        "foi analisado pela equipe técnica", "pode ser acompanhado pelo painel",
+    ],
+}
+
+CONNECTORS = ["Além disso,", "Por outro lado,", "No geral,", "Ainda assim,", "Também notei que", "Depois disso,"]
+
+SEARCH_TERMS = [
+    "produto", "entrega", "atendimento", "problema", "qualidade", "prazo", "suporte",
+    "aplicativo", "pagamento", "excelente", "péssimo", "defeito", "atualização", "relatório",
+    # Termos que não aparecem nos textos gerados (buscas sem resultado)
+    "garantia", "reembolso", "frete grátis",
+]
+
+SENTIMENT_WEIGHTS = {"positivo": 0.45, "negativo": 0.35, "neutro": 0.20}
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """Monta um texto de avaliação com aproximadamente o número de palavras pedido"""
+    sentiment = rng.choices(list(SENTIMENT_WEIGHTS), weights=list(SENTIMENT_WEIGHTS.values()))[0]
+    sentences: List[str] = []
+    total = 0
+    while total < words:
+        # Opiniões mistas: parte das frases usa outro sentimento
+        tone = sentiment if rng.random() < 0.7 else rng.choice(list(PREDICATES))
+        sentence = f"{rng.choice(SUBJECTS)} {rng.choice(PREDICATES[tone])}."
+        if sentences and rng.random() < 0.3:
+            sentence = f"{rng.choice(CONNECTORS)} {sentence[0].lower()}{sentence[1:]}"
+        sentences.append(sentence)
+        total += sentence.count(" ") + 1
+    return " ".join(sentences)
+
+
+def text_length(rng: random.Random, median: int, sigma: float, maximum: int) -> int:
+    """Número de palavras com distribuição log-normal (sigma 0 = tamanho fixo)"""
+    if sigma <= 0:
+        return median
+    return max(3, min(maximum, int(rng.lognormvariate(math.log(median), sigma))))
+
+
+def build_plan(total: int, search_ratio: float = 0.2, duplicate_ratio: float = 0.3,
+               words_median: int = 40, words_sigma: float = 0.8, words_max: int = 2000,
+               seed: int = 42) -> List[Tuple[str, Dict[str, str], bool]]:
+    """
+    Gera a sequência de requisições (caminho, parâmetros, repetida) antes do envio
+
+    A geração fica fora do laço de envio para não atrasar as chegadas agendadas.
+    Textos repetidos são sorteados entre os já enviados.
+    """
+    rng = random.Random(seed)
+    plan = []
+    sent: List[str] = []
+    for _ in range(total):
+        if rng.random() < search_ratio:
+            plan.append((SEARCH_PATH, {"term": rng.choice(SEARCH_TERMS)}, False))
+            continue
+        duplicate = bool(sent) and rng.random() < duplicate_ratio
+        if duplicate:
+            text = rng.choice(sent)
+        else:
+            text = make_text(rng, text_length(rng, words_median, words_sigma, words_max))
+            sent.append(text)
+        plan.append((ANALYZE_PATH, {"text": text}, duplicate))
+    return plan
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3) if values else 0.0,
+        "mean": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+
+
+async def run_load(client: httpx.AsyncClient, plan: List[Tuple[str, Dict[str, str], bool]],
+                   rate: float) -> Dict[str, Any]:
+    """Envia o plano em malha aberta a `rate` requisições/s e resume os resultados"""
+    loop = asyncio.get_running_loop()
+    # (caminho, status ou nome da exceção, latência, atraso do envio)
+    outcomes: List[Tuple[str, Any, float, float]] = []
+
+    async def send(path: str, params: Dict[str, str], scheduled: float):
+        lag = loop.time() - scheduled
+        try:
+            if path == ANALYZE_PATH:
+                response = await client.post(path, json=params)
+            else:
+                response = await client.get(path, params=params)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        outcomes.append((path, status, loop.time() - scheduled, lag))
+
+    start = loop.time()
+    tasks = []
+    for index, (path, params, _) in enumerate(plan):
+        scheduled = start + index / rate
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(path, params, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    by_path: Dict[str, List[Tuple[Any, float]]] = defaultdict(list)
+    for path, status, latency, _ in outcomes:
+        by_path[path].append((status, latency))
+    errors = sum(not (isinstance(status, int) and status < 400) for _, status, _, _ in outcomes)
+    return {
+        "requests": len(outcomes),
+        "duplicates": sum(duplicate for _, _, duplicate in plan),
+        "duration_s": round(elapsed, 3),
+        "offered_rate": rate,
+        "throughput_rps": round(len(outcomes) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(outcomes), 4) if outcomes else 0.0,
+        "status_codes": dict(Counter(str(status) for _, status, _, _ in outcomes)),
+        "latency_ms": latency_summary([latency for _, _, latency, _ in outcomes]),
+        # Atraso entre o instante agendado e o envio: alto indica que o próprio gerador não acompanhou a taxa
+        "dispatch_lag_ms": round(max((lag for _, _, _, lag in outcomes), default=0.0) * 1000, 3),
+        "endpoints": {
+            path: {
+                "requests": len(results),
+                "errors": sum(not (isinstance(status, int) and status < 400) for status, _ in results),
+                "latency_ms": latency_summary([latency for _, latency in results]),
+            }
+            for path, results in sorted(by_path.items())
+        },
+    }
+
+
+class StubGeminiModel:
+    """Gemini simulado: responde em JSON após uma latência fixa, sem rede"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    async def generate_content_async(self, prompt: str):
+        from text_analysis import compute_simple_sentiment
+
+        await asyncio.sleep(self.latency)
+        sentiment, _, _ = compute_simple_sentiment(prompt)
+        text = json.dumps({"sentiment": sentiment, "confidence": 0.9, "explanation": "Resposta simulada"})
+        return type("Response", (), {"text": text})()
+
+
+@asynccontextmanager
+async def in_process_client(stub_latency: float):
+    """Cliente ligado à aplicação local (com warm-up e encerramento) e Gemini simulado"""
+    # Sem log por requisição e sem jobs.db no diretório atual
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("JOBS_DB_PATH", os.path.join(tempfile.gettempdir(), "loadgen-jobs.db"))
+    import main
+    from gemini_provider import GeminiSentimentProvider
+
+    main.sentiment_provider = GeminiSentimentProvider(StubGeminiModel(stub_latency))
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+            yield client
+
+
+@asynccontextmanager
+async def remote_client(url: str, timeout: float, max_connections: int):
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        yield client
+
+
+def check_limits(report: Dict[str, Any], max_p99_ms: Optional[float],
+                 max_error_rate: Optional[float]) -> List[str]:
+    """Limites ultrapassados (vazio quando o resultado é aceitável)"""
+    violations = []
+    if max_p99_ms is not None and report["latency_ms"]["p99"] > max_p99_ms:
+        violations.append(f"p99 {report['latency_ms']['p99']} ms > {max_p99_ms} ms")
+    if max_error_rate is not None and report["error_rate"] > max_error_rate:
+        violations.append(f"taxa de erros {report['error_rate']} > {max_error_rate}")
+    return violations
+
+
+async def run(args) -> Dict[str, Any]:
+    total = max(1, int(args.rate * args.duration))
+    plan = build_plan(total, args.search_ratio, args.duplicate_ratio,
+                      args.words_median, args.words_sigma, args.words_max, args.seed)
+    if args.url:
+        client_context = remote_client(args.url, args.timeout, args.max_connections)
+    else:
+        client_context = in_process_client(args.stub_latency_ms / 1000)
+    async with client_context as client:
+        # Aquecimento fora da medição (conexões e caminhos de análise)
+        for path, params, _ in plan[:min(len(plan), args.warmup)]:
+            if path == ANALYZE_PATH:
+                await client.post(path, json=params)
+            else:
+                await client.get(path, params=params)
+        report = await run_load(client, plan, args.rate)
+    report["target"] = args.url or "in-process"
+    report["config"] = {
+        "rate": args.rate, "duration_s": args.duration, "search_ratio": args.search_ratio,
+        "duplicate_ratio": args.duplicate_ratio, "words_median": args.words_median,
+        "words_sigma": args.words_sigma, "words_max": args.words_max, "seed": args.seed,
+        **({} if args.url else {"stub_latency_ms": args.stub_latency_ms}),
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Servidor alvo; sem ele a aplicação roda no próprio processo")
+    parser.add_argument("--rate", type=float, default=50.0, help="Requisições por segundo")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de carga")
+    parser.add_argument("--search-ratio", type=float, default=0.2)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--words-median", type=int, default=40)
+    parser.add_argument("--words-sigma", type=float, default=0.8)
+    parser.add_argument("--words-max", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warmup", type=int, default=20, help="Requisições enviadas antes da medição")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--output", help="Também grava o relatório JSON neste arquivo")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    violations = check_limits(report, args.max_p99_ms, args.max_error_rate)
+    report["passed"] = not violations
+    report["violations"] = violations
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
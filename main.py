@@ -1,37 +1,156 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, field_validator
-from typing import List, Dict, Optional
-import re
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, field_validator, model_validator
+from typing import List, Dict, Optional, Tuple
+import asyncio
 import logging
-from collections import Counter, defaultdict
-import google.generativeai as genai
+from collections import defaultdict
 import os
+import time
+import hashlib
 from datetime import datetime
-import json
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from analysis_store import AnalysisStore
+from offload import AnalysisOffloader, OffloadQueueFull
+from gemini_provider import DEFAULT_MODEL, GeminiSentimentProvider, SentimentParseError
+from probes import HealthMonitor, ReadinessThresholds
+from admission import Admission, AdaptiveConcurrencyLimiter
+from fast_json import FastJSONResponse
+from languages import DEFAULT_LANGUAGE, LANGUAGES, detect_language, get_profile
+from text_analysis import (
+    SentimentResult, TextPayload, clean_text, compute_simple_sentiment, compute_text_statistics,
+    configure_normalization, count_top_words, language_profile, normalize_words
+)
+from jobs import JobManager, JobQueueFull, JobStore
+from tracing import OTLPExporter, Tracer, TracingMiddleware, span
+from structured_logging import SampledLogger, configure_logging
 
 # Carrega variáveis do arquivo .env
 load_dotenv()
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
+# Configuração de logging (LOG_FORMAT=json para um objeto JSON por linha)
+configure_logging(os.getenv("LOG_LEVEL", "INFO"), os.getenv("LOG_FORMAT", "text"))
 logger = logging.getLogger(__name__)
 
+# Logs do caminho quente (uma linha por requisição) são amostrados
+request_log = SampledLogger(logger, float(os.getenv("LOG_SAMPLE_RATE", 1.0)))
+
+# Trace por requisição com spans das etapas; os lentos ficam em /debug/traces
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT")
+tracer = Tracer(
+    slow_threshold=float(os.getenv("TRACING_SLOW_MS", 500)) / 1000,
+    buffer_size=int(os.getenv("TRACING_BUFFER_SIZE", 100)),
+    exporter=OTLPExporter(
+        TRACING_OTLP_ENDPOINT, os.getenv("OTEL_SERVICE_NAME", "api-analise-texto")
+    ) if TRACING_OTLP_ENDPOINT else None,
+    enabled=os.getenv("TRACING_ENABLED", "True").lower() == "true"
+)
+
 # Configuração do Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
 if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
-    logger.info("Gemini 2.0 Flash configurado com sucesso!")
+    sentiment_provider = GeminiSentimentProvider.from_api_key(GEMINI_API_KEY, GEMINI_MODEL)
+    logger.info(f"Gemini ({GEMINI_MODEL}) configurado com sucesso!")
 else:
     logger.warning("GEMINI_API_KEY não encontrada no arquivo .env. Funcionalidade de sentimento será limitada.")
-    model = None
+    sentiment_provider = None
+
+# Chamadas simultâneas ao Gemini somando todos os lotes e jobs em andamento
+# (/analyze-text já é limitado pelo controle de admissão)
+GEMINI_BATCH_CONCURRENCY = int(os.getenv("GEMINI_BATCH_CONCURRENCY", 8))
+batch_provider_slots = asyncio.Semaphore(GEMINI_BATCH_CONCURRENCY)
+
+# Classificador local de sentimento (primeiro nível): carregado no warm-up quando
+# o arquivo de pesos existe; só textos abaixo do limite de confiança vão para o Gemini
+SENTIMENT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH", "models/sentiment.npz")
+SENTIMENT_MODEL_THRESHOLD = float(os.getenv("SENTIMENT_MODEL_THRESHOLD", 0.8))
+sentiment_model = None
+sentiment_tiers = {"answered_locally": 0, "escalated": 0}
+
+# Origem de cada sentimento (entra na ETag da análise): versão do Gemini,
+# do classificador local ou uma destas
+KEYWORDS_SOURCE = "palavras-chave"
+NO_PROVIDER_SOURCE = "sem-gemini"
+
+# (sentimento, origem)
+SourcedSentiment = Tuple[SentimentResult, str]
+
+# Normalização opcional das palavras (acentos e plurais em português), compartilhada
+# pela contagem de frequências, pela busca e pelos léxicos de sentimento
+NORMALIZATION_SETTINGS = (
+    os.getenv("TEXT_NORMALIZATION", "False").lower() == "true",
+    int(os.getenv("NORMALIZATION_CACHE_SIZE", 50_000))
+)
+text_normalizer = configure_normalization(*NORMALIZATION_SETTINGS)
+
+# Textos grandes são analisados em um pool de processos para não bloquear o event loop;
+# os workers importam só text_analysis e recebem a mesma configuração de normalização
+offloader = AnalysisOffloader(
+    threshold=int(os.getenv("OFFLOAD_THRESHOLD_CHARS", 200_000)),
+    pool_size=int(os.getenv("OFFLOAD_POOL_SIZE", 0)) or None,
+    max_queue=int(os.getenv("OFFLOAD_MAX_QUEUE", 64)),
+    executor=os.getenv("OFFLOAD_EXECUTOR", "auto"),
+    initializer=configure_normalization,
+    initargs=NORMALIZATION_SETTINGS
+)
+
+# Controle de admissão de /analyze-text: limite de concorrência ajustado pela latência
+admission_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=int(os.getenv("ADMISSION_INITIAL_LIMIT", 32)),
+    min_limit=int(os.getenv("ADMISSION_MIN_LIMIT", 2)),
+    max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", 512)),
+    latency_target=float(os.getenv("ADMISSION_LATENCY_TARGET_MS", 2000)) / 1000,
+    backoff=float(os.getenv("ADMISSION_BACKOFF", 0.9)),
+    degrade_ratio=float(os.getenv("ADMISSION_DEGRADE_RATIO", 0.0)),
+    enabled=os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+)
+ADMISSION_RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+
+# Estado da inicialização: a aplicação só fica pronta depois do warm-up
+startup_state = {"ready": False, "warmup_seconds": None}
+
+# Métricas de readiness coletadas em segundo plano e servidas pelo /readyz
+health_monitor = HealthMonitor(
+    queue_depth=lambda: offloader.queue_depth,
+    cache_probe=lambda: analysis_cache.get("__probe__"),
+    provider_errors=lambda: sentiment_provider.error_rate() if sentiment_provider else None,
+    thresholds=ReadinessThresholds(
+        max_loop_lag=float(os.getenv("READY_MAX_LOOP_LAG_MS", 250)) / 1000,
+        max_queue_depth=int(os.getenv("READY_MAX_QUEUE_DEPTH", 32)),
+        max_cache_latency=float(os.getenv("READY_MAX_CACHE_LATENCY_MS", 50)) / 1000,
+        max_error_rate=float(os.getenv("READY_MAX_ERROR_RATE", 0.5))
+    ),
+    interval=float(os.getenv("PROBE_INTERVAL_MS", 500)) / 1000
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida da aplicação: warm-up e sondas na subida, encerramento no desligamento"""
+    global job_manager
+    warm_up()
+    health_monitor.start()
+    # A fila de jobs (e o arquivo SQLite) só existe com a aplicação no ar, não na importação
+    owns_jobs = job_manager is None
+    if owns_jobs:
+        job_manager = create_job_manager()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    if owns_jobs:
+        job_manager.store.close()
+        job_manager = None
+    await health_monitor.stop()
+    offloader.shutdown()
+    tracer.shutdown()
 
 app = FastAPI(
     title="API de Análise de Texto",
     description="API para análise de texto com detecção de sentimento usando Google Gemini",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuração CORS
@@ -41,25 +160,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
 
-# Cache para análises anteriores
-analysis_cache: Dict[str, Dict] = {}
+# Mais externo: o trace cobre toda a requisição, inclusive os demais middlewares
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Cache para análises anteriores (registros compactos)
+# ANALYSIS_STORAGE_MODE: full (texto integral), zlib/zstd (texto comprimido) ou index (só palavras)
+analysis_cache = AnalysisStore(
+    mode=os.getenv("ANALYSIS_STORAGE_MODE", "full"),
+    normalize=text_normalizer.normalize if text_normalizer else None
+)
 search_history: List[Dict] = []
 
-# Stopwords em português
-STOPWORDS = {
-    'a', 'o', 'e', 'é', 'de', 'do', 'da', 'em', 'um', 'uma', 'para', 'com', 'não', 
-    'na', 'no', 'se', 'que', 'por', 'mais', 'das', 'dos', 'como', 'mas', 'foi', 
-    'ao', 'ele', 'sua', 'ou', 'ser', 'seu', 'à', 'até', 'pelo', 'pela', 'são', 
-    'aos', 'às', 'isso', 'ela', 'entre', 'era', 'depois', 'sem', 'mesmo', 'aos',
-    'quando', 'muito', 'nos', 'eu', 'você', 'eles', 'elas', 'já', 'só', 'tem',
-    'pode', 'onde', 'vai', 'ainda', 'essa', 'este', 'esta', 'esse', 'todas',
-    'todos', 'pela', 'pelo', 'sobre', 'antes', 'sempre', 'bem', 'também'
-}
+# Stopwords em português (tabelas de todos os idiomas em languages.py)
+STOPWORDS = get_profile(DEFAULT_LANGUAGE).stopwords
+
+# Limite de textos por chamada de POST /analyze-batch
+BATCH_MAX_TEXTS = int(os.getenv("BATCH_MAX_TEXTS", 1000))
+
+# Entradas do vocabulário de cada motor em lote antes de ele ser reconstruído
+BATCH_VOCABULARY_MAX = int(os.getenv("BATCH_VOCABULARY_MAX", 100_000))
+
+# Motores vetorizados de estatísticas para lotes, um por idioma, com vocabulário
+# compartilhado (criados no primeiro uso para não importar o NumPy na subida)
+_batch_engines: Dict[str, "BatchStatsEngine"] = {}
+
+def get_batch_engine(language: str = DEFAULT_LANGUAGE):
+    """Retorna o motor de estatísticas em lote do idioma, criando-o na primeira chamada"""
+    engine = _batch_engines.get(language)
+    if engine is None:
+        from batch_stats import BatchStatsEngine
+        normalize = None
+        if text_normalizer is not None:
+            normalize = lambda word: text_normalizer.normalize(word, language)
+        engine = _batch_engines[language] = BatchStatsEngine(
+            language_profile(language).stopwords, normalize=normalize,
+            max_vocabulary=BATCH_VOCABULARY_MAX
+        )
+    return engine
+
+def validate_language(language: Optional[str]) -> Optional[str]:
+    """Valida o campo opcional language das requisições"""
+    if language is not None and language not in LANGUAGES:
+        raise ValueError(f"Idioma não suportado: '{language}'. Use um de: {', '.join(LANGUAGES)}")
+    return language
 
 class TextAnalysisRequest(BaseModel):
     text: str
+    # Idioma do texto; quando omitido é detectado automaticamente
+    language: Optional[str] = None
+    
+    @field_validator('language')
+    @classmethod
+    def language_must_be_supported(cls, v):
+        return validate_language(v)
     
     @field_validator('text')
     @classmethod
@@ -68,6 +224,48 @@ class TextAnalysisRequest(BaseModel):
             raise ValueError('O texto não pode estar vazio')
         return v
 
+class BatchAnalysisRequest(BaseModel):
+    texts: List[str]
+    # Idioma de todos os textos; quando omitido é detectado para cada texto
+    language: Optional[str] = None
+    
+    @field_validator('language')
+    @classmethod
+    def language_must_be_supported(cls, v):
+        return validate_language(v)
+    
+    @field_validator('texts')
+    @classmethod
+    def texts_must_not_be_empty(cls, v):
+        if not v:
+            raise ValueError('A lista de textos não pode estar vazia')
+        if len(v) > BATCH_MAX_TEXTS:
+            raise ValueError(f'O lote aceita no máximo {BATCH_MAX_TEXTS} textos')
+        if any(not text.strip() for text in v):
+            raise ValueError('O texto não pode estar vazio')
+        return v
+
+class JobRequest(BaseModel):
+    text: Optional[str] = None
+    texts: Optional[List[str]] = None
+    language: Optional[str] = None
+    
+    @field_validator('language')
+    @classmethod
+    def language_must_be_supported(cls, v):
+        return validate_language(v)
+    
+    @model_validator(mode='after')
+    def exactly_one_input(self):
+        if (self.text is None) == (self.texts is None):
+            raise ValueError('Informe "text" ou "texts", mas não ambos')
+        texts = [self.text] if self.text is not None else self.texts
+        BatchAnalysisRequest.texts_must_not_be_empty(texts)
+        return self
+    
+    def all_texts(self) -> List[str]:
+        return [self.text] if self.text is not None else list(self.texts)
+
 class WordFrequency(BaseModel):
     word: str
     frequency: int
@@ -83,150 +281,351 @@ class TextAnalysisResponse(BaseModel):
     sentiment_analysis: SentimentAnalysis
     analysis_timestamp: str
 
+class BatchAnalysisResponse(BaseModel):
+    results: List[TextAnalysisResponse]
+
+class JobCreatedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class JobResult(BaseModel):
+    digests: List[str]
+    results: List[TextAnalysisResponse]
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    result: Optional[JobResult] = None
+    error: Optional[str] = None
+
 class SearchTermResponse(BaseModel):
     term: str
     found: bool
     occurrences: int
     last_analysis_timestamp: Optional[str] = None
 
-def clean_text(text: str) -> str:
-    """Remove pontuação e converte para minúsculas"""
-    # Remove pontuação e caracteres especiais, mantém apenas letras e espaços
-    cleaned = re.sub(r'[^\w\s]', ' ', text.lower())
-    # Remove espaços extras
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    return cleaned
-
-def get_word_frequencies(text: str, exclude_stopwords: bool = True) -> List[WordFrequency]:
+def get_word_frequencies(text: str, exclude_stopwords: bool = True,
+                         language: str = DEFAULT_LANGUAGE) -> List[WordFrequency]:
     """Calcula a frequência das palavras no texto"""
     cleaned_text = clean_text(text)
-    words = cleaned_text.split()
+    words = normalize_words(cleaned_text.split(), language)
     
-    if exclude_stopwords:
-        words = [word for word in words if word not in STOPWORDS and len(word) > 2]
-    
-    word_counts = Counter(words)
-    
-    # Retorna as 5 palavras mais frequentes
-    most_common = word_counts.most_common(5)
+    most_common = count_top_words(words, exclude_stopwords, language)
     
     return [WordFrequency(word=word, frequency=freq) for word, freq in most_common]
 
-async def analyze_sentiment_with_gemini(text: str) -> SentimentAnalysis:
-    """Analisa o sentimento do texto usando Google Gemini"""
-    if not model:
-        return SentimentAnalysis(
-            sentiment="neutro",
-            confidence=0.5,
-            explanation="API key do Gemini não configurada"
+async def analyze_statistics(text: str, language: str = DEFAULT_LANGUAGE
+                             ) -> Tuple[int, List[Tuple[str, int]], Optional[TextPayload]]:
+    """
+    Contagem, palavras mais frequentes e texto preparado para o cache (índice ou
+    comprimido), no pool quando o texto é grande
+    """
+    with span("statistics", offloaded=offloader.should_offload(text)):
+        word_count, words, frequencies, index = await offloader.run(
+            compute_text_statistics, text, language, analysis_cache.mode, analysis_cache.compression_level
         )
+    return word_count, list(zip(words, frequencies)), index
+
+async def local_sentiment(text: str, language: str = DEFAULT_LANGUAGE) -> SentimentResult:
+    """Análise de sentimento local, no pool quando o texto é grande"""
+    with span("keyword_sentiment"):
+        return await offloader.run(compute_simple_sentiment, text, language)
+
+def model_sentiments(texts: List[str]) -> List[Optional[SentimentResult]]:
+    """
+    Classifica o lote com o modelo local; None nos textos que devem ir para o Gemini
     
-    try:
-        prompt = f"""
-        Analise o sentimento do seguinte texto em português e responda APENAS com um JSON no formato:
-        {{"sentiment": "positivo/negativo/neutro", "confidence": 0.0-1.0, "explanation": "breve explicação"}}
-        
-        Texto para análise: "{text}"
-        """
-        
-        response = model.generate_content(prompt)
-        
-        # Tenta extrair JSON da resposta
-        response_text = response.text.strip()
-        
-        # Remove possíveis markdown ou texto extra
-        if "```json" in response_text:
-            json_part = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            json_part = response_text.split("```")[1]
+    Sem Gemini configurado não há para onde escalar e o modelo responde tudo.
+    Os escalonamentos são contados por quem chama o Gemini, não aqui: no caminho
+    degradado os incertos vão para as palavras-chave.
+    """
+    if sentiment_model is None:
+        return [None] * len(texts)
+    with span("local_model", texts=len(texts)):
+        predictions = sentiment_model.predict(texts)
+    results = []
+    for label, confidence in predictions:
+        if confidence >= SENTIMENT_MODEL_THRESHOLD or not sentiment_provider:
+            sentiment_tiers["answered_locally"] += 1
+            results.append((label, round(confidence, 4),
+                            f"Classificador local: {label} com confiança {confidence:.2f}"))
         else:
-            json_part = response_text
-        
-        try:
-            result = json.loads(json_part)
-            return SentimentAnalysis(
-                sentiment=result.get("sentiment", "neutro"),
-                confidence=float(result.get("confidence", 0.5)),
-                explanation=result.get("explanation", "Análise realizada com Gemini")
-            )
-        except json.JSONDecodeError:
-            # Fallback para análise simples baseada em palavras
-            return simple_sentiment_analysis(text)
-            
+            results.append(None)
+    return results
+
+def model_source() -> str:
+    """Origem das respostas do classificador local"""
+    return f"local-{sentiment_model.version}"
+
+async def sentiment_result(text: str, language: str = DEFAULT_LANGUAGE) -> SourcedSentiment:
+    """Sentimento (e origem) pelo classificador local ou, se incerto, via Gemini"""
+    local, = model_sentiments([text])
+    if local:
+        return local, model_source()
+    if sentiment_model is not None:
+        sentiment_tiers["escalated"] += 1
+    return await provider_sentiment(text, language)
+
+async def sentiment_results(texts: List[str], languages: List[str]) -> List[SourcedSentiment]:
+    """Sentimento de um lote: o modelo local classifica tudo de uma vez e só os incertos vão para o Gemini"""
+    results = [(local, model_source()) if local else None for local in model_sentiments(texts)]
+    uncertain = [index for index, result in enumerate(results) if result is None]
+    if sentiment_model is not None:
+        sentiment_tiers["escalated"] += len(uncertain)
+    escalated = await asyncio.gather(*(
+        limited_provider_sentiment(texts[index], languages[index]) for index in uncertain
+    ))
+    for index, result in zip(uncertain, escalated):
+        results[index] = result
+    return results
+
+async def limited_provider_sentiment(text: str, language: str = DEFAULT_LANGUAGE) -> SourcedSentiment:
+    """provider_sentiment dentro do limite de chamadas simultâneas de lotes e jobs"""
+    async with batch_provider_slots:
+        return await provider_sentiment(text, language)
+
+async def provider_sentiment(text: str, language: str = DEFAULT_LANGUAGE) -> SourcedSentiment:
+    """Sentimento via Gemini, com a análise local como fallback"""
+    if not sentiment_provider:
+        return ("neutro", 0.5, "API key do Gemini não configurada"), NO_PROVIDER_SOURCE
+    
+    try:
+        # O modelo já tem instrução de sistema e schema de resposta; envia só o texto
+        return await sentiment_provider.analyze(text), sentiment_provider.version
+    except SentimentParseError:
+        # Resposta fora do schema (já contabilizada nas métricas do provedor)
+        pass
     except Exception as e:
         logger.error(f"Erro na análise de sentimento com Gemini: {e}")
-        return simple_sentiment_analysis(text)
+    return await local_sentiment(text, language), KEYWORDS_SOURCE
+
+async def analyze_sentiment_with_gemini(text: str) -> SentimentAnalysis:
+    """Analisa o sentimento do texto usando Google Gemini"""
+    (sentiment, confidence, explanation), _ = await sentiment_result(text)
+    return SentimentAnalysis(sentiment=sentiment, confidence=confidence, explanation=explanation)
 
-def simple_sentiment_analysis(text: str) -> SentimentAnalysis:
+def simple_sentiment_analysis(text: str, language: str = DEFAULT_LANGUAGE) -> SentimentAnalysis:
     """Análise de sentimento simples baseada em palavras-chave"""
-    positive_words = {
-        'bom', 'ótimo', 'excelente', 'maravilhoso', 'fantástico', 'incrível', 
-        'adorável', 'perfeito', 'feliz', 'alegre', 'satisfeito', 'contente',
-        'amor', 'sucesso', 'vitória', 'ganhar', 'positivo', 'bonito'
+    sentiment, confidence, explanation = compute_simple_sentiment(text, language)
+    return SentimentAnalysis(sentiment=sentiment, confidence=confidence, explanation=explanation)
+
+def analysis_variant(language: str) -> str:
+    """Idioma e normalização com que o texto é analisado (mudam stopwords, léxicos e palavras)"""
+    return f"{language}+normalizado" if text_normalizer is not None else language
+
+def text_digest(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """
+    Digest SHA-256 do texto analisado em um idioma e normalização, usado como
+    chave do cache e em GET /analyses/{digest}
+    
+    O mesmo texto em outro idioma (ou com outra normalização) é outra análise:
+    tem outro digest e não sobrescreve o registro existente.
+    """
+    return hashlib.sha256(f"{analysis_variant(language)}\n{text}".encode("utf-8")).hexdigest()
+
+def analysis_version(source: str, language: str) -> str:
+    """Versão guardada no registro: origem do sentimento, idioma e normalização"""
+    return f"{source};{analysis_variant(language)}"
+
+def analysis_etag(digest: str, version: str) -> str:
+    """
+    ETag de uma análise: digest mais a versão guardada no registro
+    
+    A versão traz quem produziu o sentimento, o idioma e a normalização:
+    resultados do caminho degradado ou do fallback por palavras-chave têm ETag
+    diferente da análise pelo Gemini, então a revalidação traz a análise nova.
+    É fraca (W/) porque reanálises do mesmo texto mudam o timestamp, mas não o
+    significado da análise.
+    """
+    version_tag = hashlib.sha256(version.encode("utf-8")).hexdigest()[:12]
+    return f'W/"{digest}-{version_tag}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match com a ETag (comparação fraca, aceita lista e *)"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+def analysis_headers(etag: str, digest: str) -> Dict[str, str]:
+    """Cabeçalhos de cache HTTP das respostas de análise"""
+    # Caches intermediários podem guardar, mas devem revalidar com a ETag
+    return {
+        "ETag": etag,
+        "Cache-Control": "public, no-cache",
+        "Content-Location": f"/analyses/{digest}"
     }
+
+def not_modified(etag: str, digest: str) -> Response:
+    return Response(status_code=304, headers=analysis_headers(etag, digest))
+
+def store_analysis(text: str, word_count: int, word_frequencies: List[Tuple[str, int]],
+                   sentiment: SentimentResult, digest: str,
+                   payload: Optional[TextPayload] = None, version: Optional[str] = None) -> str:
+    """Armazena a análise no cache e no histórico, retornando o timestamp"""
+    # Timestamp da análise
+    timestamp = datetime.now().isoformat()
     
-    negative_words = {
-        'ruim', 'péssimo', 'terrível', 'horrível', 'triste', 'deprimido',
-        'raiva', 'ódio', 'problema', 'problemas', 'erro', 'erros', 'falha', 'defeito', 'negativo',
-        'impossível', 'difícil', 'complicado', 'frustrado', 'chateado', 'infelizmente',
-        'não', 'bugs', 'bug', 'urgentemente', 'resolvidos', 'esperado', 'funcionando'    }
-    
-    text_lower = clean_text(text)
-    words = set(text_lower.split())
-    
-    # Verifica padrões negativos específicos
-    negative_patterns = [
-        "não está funcionando",
-        "não funciona", 
-        "cheio de problemas",
-        "muitos problemas",
-        "cheio de bugs",
-        "muitos bugs"
-    ]
-    
-    pattern_found = any(pattern in text_lower for pattern in negative_patterns)
-    
-    positive_count = len(words.intersection(positive_words))
-    negative_count = len(words.intersection(negative_words))
-    
-    # Se encontrou padrão negativo, aumenta peso negativo
-    if pattern_found:
-        negative_count += 2    
-    if positive_count > negative_count:
-        sentiment = "positivo"
-        confidence = min(0.85, 0.5 + (positive_count - negative_count) * 0.1)
-        # Identifica palavras positivas encontradas
-        positive_found = [word for word in words if word in positive_words]
-        if positive_found:
-            explanation = f"Texto contém palavras positivas como '{', '.join(positive_found[:3])}', indicando sentimento favorável"
-        else:
-            explanation = "Análise indica tom positivo baseado no contexto geral"
-    elif negative_count > positive_count:
-        sentiment = "negativo"  
-        confidence = min(0.85, 0.5 + (negative_count - positive_count) * 0.1)
-        # Identifica palavras negativas encontradas
-        negative_found = [word for word in words if word in negative_words]
-        patterns_found = [pattern for pattern in negative_patterns if pattern in text_lower]
-        
-        if patterns_found and negative_found:
-            explanation = f"Texto expressa frustração com frases como '{patterns_found[0]}' e palavras negativas como '{', '.join(negative_found[:2])}'"
-        elif patterns_found:
-            explanation = f"Detectada expressão negativa: '{patterns_found[0]}'"
-        elif negative_found:
-            explanation = f"Presença de palavras negativas: '{', '.join(negative_found[:3])}'"
-        else:
-            explanation = "Análise indica tom negativo baseado no contexto"
-    else:
-        sentiment = "neutro"
-        confidence = 0.5
-        explanation = "Texto não apresenta palavras claramente positivas ou negativas, mantendo tom neutro"
-    
-    return SentimentAnalysis(
-        sentiment=sentiment,
+    # Cache usando o digest do texto (com idioma e normalização) como chave
+    label, confidence, explanation = sentiment
+    analysis_cache.put(
+        digest,
+        text,
+        word_count=word_count,
+        word_frequencies=word_frequencies,
+        sentiment=label,
         confidence=confidence,
-        explanation=explanation
+        explanation=explanation,
+        timestamp=timestamp,
+        payload=payload,
+        version=version
+    )
+    
+    # Adiciona ao histórico
+    search_history.append({
+        "text": text,
+        "timestamp": timestamp,
+        "hash": digest
+    })
+    
+    # Mantém apenas os últimos 100 registros
+    if len(search_history) > 100:
+        search_history.pop(0)
+    
+    return timestamp
+
+def build_cached_analysis(record) -> Dict:
+    """Monta a resposta de análise a partir de um registro do cache"""
+    return build_analysis(
+        record.word_count,
+        record.word_frequencies,
+        (record.sentiment, record.confidence, record.explanation),
+        record.timestamp
+    )
+
+def build_analysis(word_count: int, word_frequencies: List[Tuple[str, int]],
+                   sentiment: SentimentResult, timestamp: str) -> Dict:
+    """Monta a resposta de análise como dict no formato de TextAnalysisResponse"""
+    label, confidence, explanation = sentiment
+    return {
+        "word_count": word_count,
+        "most_frequent_words": [{"word": word, "frequency": freq} for word, freq in word_frequencies],
+        "sentiment_analysis": {"sentiment": label, "confidence": confidence, "explanation": explanation},
+        "analysis_timestamp": timestamp
+    }
+
+WARMUP_TEXT = "Texto de aquecimento: a API está ótima, sem problemas e sem erros."
+
+def load_sentiment_model():
+    """Carrega os pesos do classificador local, se o arquivo existir"""
+    global sentiment_model
+    if not os.path.exists(SENTIMENT_MODEL_PATH):
+        logger.info(f"Classificador local desativado ({SENTIMENT_MODEL_PATH} não encontrado)")
+        return
+    from sentiment_model import SentimentClassifier
+    sentiment_model = SentimentClassifier.load(SENTIMENT_MODEL_PATH)
+    logger.info(f"Classificador local {sentiment_model.version} carregado de {SENTIMENT_MODEL_PATH}")
+
+def warm_up():
+    """Carrega dependências pesadas e exercita o caminho de análise antes de ficar pronto"""
+    start = time.perf_counter()
+    
+    if sentiment_model is None:
+        load_sentiment_model()
+    
+    # Importa o SDK do Gemini e cria o modelo
+    if sentiment_provider:
+        sentiment_provider.initialize()
+    
+    # Importa o NumPy e compila as expressões regulares usadas na análise
+    language = detect_language(WARMUP_TEXT)
+    get_batch_engine(language).analyze([WARMUP_TEXT])
+    word_count, words, frequencies, _ = compute_text_statistics(WARMUP_TEXT, language)
+    sentiment = compute_simple_sentiment(WARMUP_TEXT, language)
+    if sentiment_model is not None:
+        sentiment_model.predict([WARMUP_TEXT])
+    
+    # Exercita a montagem e a serialização da resposta
+    FastJSONResponse(build_analysis(
+        word_count, list(zip(words, frequencies)), sentiment, datetime.now().isoformat()
+    ))
+    
+    startup_state["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    startup_state["ready"] = True
+    logger.info(f"Warm-up concluído em {startup_state['warmup_seconds']}s")
+
+async def run_batch_analysis(texts: List[str],
+                             language: Optional[str] = None) -> Tuple[List[str], List[Dict]]:
+    """Analisa e armazena vários textos, retornando (digests, análises)"""
+    languages = [language or detect_language(text) for text in texts]
+    statistics = [None] * len(texts)
+    # Textos grandes (ou texto único): estatísticas e índice do cache pelo pool de análise,
+    # para não bloquear o event loop
+    large = [index for index, text in enumerate(texts) if len(texts) == 1 or offloader.should_offload(text)]
+    offloaded = await asyncio.gather(*(analyze_statistics(texts[index], languages[index]) for index in large))
+    for index, result in zip(large, offloaded):
+        statistics[index] = result
+    
+    # Demais textos: contagens e palavras mais frequentes em uma passada por idioma
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for index, text_language in enumerate(languages):
+        if statistics[index] is None:
+            groups[text_language].append(index)
+    for text_language, indexes in groups.items():
+        batch = get_batch_engine(text_language).analyze([texts[index] for index in indexes])
+        for index, word_count, word_frequencies in zip(
+            indexes, batch.word_counts, batch.most_frequent_words
+        ):
+            statistics[index] = (word_count, word_frequencies, None)
+    
+    # Análises de sentimento: modelo local em lote e Gemini em paralelo para os incertos
+    sentiments = await sentiment_results(texts, languages)
+    
+    digests, results = [], []
+    for text, text_language, (word_count, word_frequencies, payload), (sentiment, source) in zip(
+        texts, languages, statistics, sentiments
+    ):
+        digest = text_digest(text, text_language)
+        timestamp = store_analysis(text, word_count, word_frequencies, sentiment, digest, payload,
+                                   analysis_version(source, text_language))
+        digests.append(digest)
+        results.append(build_analysis(word_count, word_frequencies, sentiment, timestamp))
+    return digests, results
+
+async def process_job(payload: Dict) -> Dict:
+    """Executa um job de análise; as análises também ficam no cache por digest"""
+    with tracer.trace("job") as trace:
+        if trace:
+            trace.attributes["texts"] = len(payload["texts"])
+        digests, results = await run_batch_analysis(payload["texts"], payload.get("language"))
+    return {"digests": digests, "results": results}
+
+# Jobs assíncronos com fila persistente, compartilhável entre processos; criada no lifespan
+job_manager: Optional[JobManager] = None
+
+def create_job_manager() -> JobManager:
+    return JobManager(
+        JobStore(os.getenv("JOBS_DB_PATH", "jobs.db")),
+        process_job,
+        workers=int(os.getenv("JOBS_WORKERS", 4)),
+        max_queue=int(os.getenv("JOBS_MAX_QUEUE", 1000)),
+        retention=float(os.getenv("JOBS_RETENTION_HOURS", 24)) * 3600,
+        lease=float(os.getenv("JOBS_LEASE_SECONDS", 300)),
+        poll_interval=float(os.getenv("JOBS_POLL_INTERVAL", 0.5))
     )
 
+def running_job_manager() -> JobManager:
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Fila de jobs não iniciada", headers={"Retry-After": "5"})
+    return job_manager
+
 @app.get("/")
 async def root():
     """Endpoint raiz com informações da API"""
@@ -235,7 +634,14 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "analyze": "POST /analyze-text",
+            "analyze_batch": "POST /analyze-batch",
+            "analysis": "GET /analyses/{digest}",
+            "jobs": "POST /jobs",
+            "job_status": "GET /jobs/{job_id}",
             "search": "GET /search-term?term=palavra",
+            "liveness": "GET /livez",
+            "readiness": "GET /readyz",
+            "slow_traces": "GET /debug/traces",
             "docs": "GET /docs"
         }
     }
@@ -244,61 +650,147 @@ async def root():
 async def analyze_text(request: TextAnalysisRequest):
     """
     Analisa um texto e retorna estatísticas básicas e análise de sentimento
+    
+    If-None-Match não é avaliado: 304 só vale para GET e HEAD (RFC 9110), então
+    a revalidação é feita em GET /analyses/{digest}.
     """
+    text = request.text.strip()
+    
+    # Acima do limite de concorrência: caminho degradado ou rejeição imediata
+    admission = admission_limiter.admit()
+    if admission is Admission.REJECTED:
+        logger.warning("Análise rejeitada pelo controle de admissão")
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço sobrecarregado, tente novamente em instantes",
+            headers={"Retry-After": ADMISSION_RETRY_AFTER}
+        )
+    
+    start = time.perf_counter()
     try:
-        text = request.text.strip()
-        
-        # Contagem de palavras
-        word_count = len(clean_text(text).split())
-        
-        # Palavras mais frequentes
-        most_frequent_words = get_word_frequencies(text)
+        # Idioma informado pelo cliente ou detectado pelo início do texto
+        if request.language:
+            language = request.language
+        else:
+            with span("detect_language"):
+                language = detect_language(text)
+        digest = text_digest(text, language)
         
-        # Análise de sentimento
-        sentiment_analysis = await analyze_sentiment_with_gemini(text)
+        # Contagem de palavras e palavras mais frequentes
+        word_count, word_frequencies, payload = await analyze_statistics(text, language)
         
-        # Timestamp da análise
-        timestamp = datetime.now().isoformat()
+        # Análise de sentimento (só palavras-chave no caminho degradado)
+        if admission is Admission.DEGRADED:
+            local = model_sentiments([text])[0]
+            if local:
+                sentiment, source = local, model_source()
+            else:
+                sentiment, source = await local_sentiment(text, language), KEYWORDS_SOURCE
+        else:
+            sentiment, source = await sentiment_result(text, language)
         
         # Armazena no cache para pesquisas futuras
-        analysis_data = {
-            "text": text,
-            "word_count": word_count,
-            "most_frequent_words": most_frequent_words,
-            "sentiment_analysis": sentiment_analysis,
-            "timestamp": timestamp
-        }
+        version = analysis_version(source, language)
+        with span("store"):
+            timestamp = store_analysis(text, word_count, word_frequencies, sentiment, digest, payload, version)
         
-        # Cache usando hash do texto como chave
-        text_hash = str(hash(text))
-        analysis_cache[text_hash] = analysis_data
+        request_log.info("Análise realizada", words=word_count, language=language,
+                         sentiment=sentiment[0], degraded=admission is Admission.DEGRADED)
+        
+        # Dados internos já confiáveis: serializa uma vez, sem revalidar pelo response_model
+        response = FastJSONResponse(
+            build_analysis(word_count, word_frequencies, sentiment, timestamp),
+            headers=analysis_headers(analysis_etag(digest, version), digest)
+        )
+        if admission is Admission.DEGRADED:
+            response.headers["X-Analysis-Degraded"] = "true"
+        return response
         
-        # Adiciona ao histórico
-        search_history.append({
-            "text": text,
-            "timestamp": timestamp,
-            "hash": text_hash
-        })
+    except OffloadQueueFull as e:
+        logger.warning(f"Análise rejeitada: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro na análise de texto: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    finally:
+        if admission is Admission.ADMITTED:
+            admission_limiter.release(time.perf_counter() - start)
+
+@app.post("/analyze-batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analisa vários textos de uma vez, com estatísticas calculadas em lote
+    """
+    try:
+        texts = [text.strip() for text in request.texts]
         
-        # Mantém apenas os últimos 100 registros
-        if len(search_history) > 100:
-            search_history.pop(0)
+        _, results = await run_batch_analysis(texts, request.language)
         
-        logger.info(f"Análise realizada para texto de {word_count} palavras")
+        request_log.info("Análise em lote realizada", texts=len(texts))
         
-        return TextAnalysisResponse(
-            word_count=word_count,
-            most_frequent_words=most_frequent_words,
-            sentiment_analysis=sentiment_analysis,
-            analysis_timestamp=timestamp
-        )
+        return FastJSONResponse({"results": results})
         
+    except OffloadQueueFull as e:
+        logger.warning(f"Análise em lote rejeitada: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Erro na análise de texto: {e}")
+        logger.error(f"Erro na análise em lote: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
+@app.get("/analyses/{digest}", response_model=TextAnalysisResponse)
+async def get_analysis(digest: str, if_none_match: Optional[str] = Header(default=None)):
+    """
+    Retorna a análise armazenada para o digest do texto (ver text_digest)
+    
+    Com If-None-Match igual à ETag atual responde 304, sem corpo.
+    """
+    digest = digest.lower()
+    with span("cache_lookup"):
+        record = analysis_cache.get(digest)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Análise não encontrada para este digest")
+    
+    etag = analysis_etag(digest, record.version or analysis_version(KEYWORDS_SOURCE, DEFAULT_LANGUAGE))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, digest)
+    
+    with span("serialize"):
+        body = build_cached_analysis(record)
+    return FastJSONResponse(body, headers=analysis_headers(etag, digest))
+
+@app.post("/jobs", response_model=JobCreatedResponse, status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Enfileira uma análise (texto único ou lote) e retorna o id do job imediatamente
+    """
+    texts = [text.strip() for text in request.all_texts()]
+    try:
+        job_id = running_job_manager().submit({"texts": texts, "language": request.language})
+    except JobQueueFull as e:
+        logger.warning(f"Job rejeitado: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    status_url = f"/jobs/{job_id}"
+    return FastJSONResponse(
+        {"job_id": job_id, "status": "queued", "status_url": status_url},
+        status_code=202,
+        headers={"Location": status_url}
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Retorna o status do job e, quando concluído, o resultado
+    """
+    job = running_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return FastJSONResponse(job)
+
 @app.get("/search-term", response_model=SearchTermResponse)
 async def search_term(term: str):
     """
@@ -308,26 +800,34 @@ async def search_term(term: str):
         raise HTTPException(status_code=400, detail="Termo de busca não pode estar vazio")
     
     term_lower = term.lower().strip()
+    if text_normalizer is not None:
+        # Mesma normalização aplicada às palavras dos textos armazenados
+        term_lower = text_normalizer.normalize_phrase(term_lower)
+    if not analysis_cache.supports_phrase_search and any(char.isspace() for char in term_lower):
+        # Sem a ordem das palavras, uma frase nunca seria encontrada: erro explícito em vez de found=false
+        raise HTTPException(
+            status_code=400,
+            detail="Busca por frases não é suportada com ANALYSIS_STORAGE_MODE=index; busque uma palavra por vez"
+        )
     found = False
     total_occurrences = 0
     last_timestamp = None
     
     # Busca no histórico de análises
-    for analysis_data in analysis_cache.values():
-        text = analysis_data["text"]
-        text_lower = clean_text(text)
-        
-        # Conta ocorrências do termo
-        occurrences = text_lower.count(term_lower)
-        if occurrences > 0:
-            found = True
-            total_occurrences += occurrences
-            
-            # Atualiza o timestamp da última análise que contém o termo
-            if not last_timestamp or analysis_data["timestamp"] > last_timestamp:
-                last_timestamp = analysis_data["timestamp"]
-    
-    logger.info(f"Busca realizada para termo '{term}': {total_occurrences} ocorrências")
+    with span("search", records=len(analysis_cache)):
+        for record in analysis_cache.values():
+            # Conta ocorrências do termo no texto limpo, qualquer que seja o modo de armazenamento
+            occurrences = analysis_cache.count_term(record, term_lower)
+            if occurrences > 0:
+                found = True
+                total_occurrences += occurrences
+                
+                # Atualiza o timestamp da última análise que contém o termo
+                timestamp = record.timestamp
+                if not last_timestamp or timestamp > last_timestamp:
+                    last_timestamp = timestamp
+    
+    request_log.info("Busca realizada", term=term, occurrences=total_occurrences)
     
     return SearchTermResponse(
         term=term,
@@ -341,11 +841,48 @@ async def health_check():
     """Endpoint de verificação de saúde da API"""
     return {
         "status": "healthy",
+        "ready": startup_state["ready"],
         "timestamp": datetime.now().isoformat(),
-        "gemini_configured": model is not None,
-        "cache_size": len(analysis_cache)
+        "gemini_configured": sentiment_provider is not None,
+        "gemini": sentiment_provider.metrics() if sentiment_provider else None,
+        "cache_size": len(analysis_cache),
+        "offload": offloader.metrics(),
+        "admission": admission_limiter.metrics(),
+        "jobs": job_manager.metrics() if job_manager else None,
+        "normalization": text_normalizer.metrics() if text_normalizer else None,
+        "sentiment_model": {
+            "version": sentiment_model.version,
+            "threshold": SENTIMENT_MODEL_THRESHOLD,
+            **sentiment_tiers
+        } if sentiment_model else None,
+        "tracing": tracer.metrics()
+    }
+
+@app.get("/debug/traces")
+async def slow_traces():
+    """Traces recentes acima de TRACING_SLOW_MS, com os spans de cada etapa"""
+    return {
+        "slow_threshold_ms": round(tracer.slow_threshold * 1000),
+        "traces": tracer.slow_traces_snapshot()
     }
 
+@app.get("/livez")
+async def liveness_probe():
+    """Liveness: o processo está de pé e o event loop responde"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_probe():
+    """Readiness: só aceita tráfego após o warm-up e com as métricas dentro dos limites"""
+    snapshot = health_monitor.snapshot
+    if not startup_state["ready"]:
+        snapshot = {**snapshot, "ready": False, "reasons": ["warm-up não concluído"]}
+    status_code = 200 if snapshot["ready"] else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ready" if snapshot["ready"] else "not_ready", **snapshot}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,114 @@
+"""
+Despacho de análises pesadas para fora do event loop
+
+Textos pequenos são processados diretamente (o custo de enviar o texto para
+outro processo seria maior que a análise). Textos acima do limite vão para um
+pool de processos, ou de threads em builds do Python sem GIL, para não bloquear
+as demais requisições do worker.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+EXECUTOR_KINDS = ("auto", "process", "thread")
+
+
+class OffloadQueueFull(Exception):
+    """Fila do pool cheia: a requisição deve ser rejeitada ou repetida depois"""
+
+
+def gil_enabled() -> bool:
+    """Indica se o interpretador roda com GIL (False em builds free-threaded)"""
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class AnalysisOffloader:
+    """Executa funções inline ou em um pool conforme o tamanho do texto"""
+
+    def __init__(self, threshold: int = 200_000, pool_size: Optional[int] = None,
+                 max_queue: int = 64, executor: str = "auto",
+                 initializer: Optional[Callable[..., Any]] = None, initargs: tuple = ()):
+        if executor not in EXECUTOR_KINDS:
+            raise ValueError(f"Executor inválido: '{executor}'. Use um de: {', '.join(EXECUTOR_KINDS)}")
+        if executor == "auto":
+            executor = "process" if gil_enabled() else "thread"
+        self.threshold = threshold
+        self.pool_size = pool_size or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.executor_kind = executor
+        # Executado em cada processo do pool (threads compartilham o estado do processo da API)
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor: Optional[Executor] = None
+        # Métricas
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Tarefas aguardando um worker livre do pool"""
+        return max(0, self.in_flight - self.pool_size)
+
+    def should_offload(self, text: str) -> bool:
+        return len(text) >= self.threshold
+
+    def _get_executor(self) -> Executor:
+        # O pool só é criado no primeiro texto grande
+        if self._executor is None:
+            if self.executor_kind == "process":
+                # spawn evita herdar threads (gRPC, event loop) do processo pai via fork
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._initializer, initargs=self._initargs
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="analysis"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], text: str, *args) -> Any:
+        """Executa fn(text, *args), no pool quando o texto passa do limite"""
+        if not self.should_offload(text):
+            self.inline += 1
+            return fn(text, *args)
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise OffloadQueueFull(f"Fila de análise cheia ({self.max_queue} tarefas aguardando)")
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.offloaded += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, text, *args)
+        finally:
+            self.in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "threshold": self.threshold,
+            "pool_size": self.pool_size,
+            "max_queue": self.max_queue,
+            "pool_started": self._executor is not None,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_in_flight": self.max_in_flight,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,106 @@
+"""
+Sondas de liveness e readiness
+
+Um monitor em segundo plano mede periodicamente o atraso do event loop, a fila
+do pool de análise, a latência do cache e a taxa de erros recente do provedor,
+e guarda o resultado. Os endpoints só leem esse último resultado, então
+respondem imediatamente mesmo com o worker sobrecarregado.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReadinessThresholds:
+    """Limites acima dos quais o worker deixa de receber tráfego"""
+    max_loop_lag: float = 0.25
+    max_queue_depth: int = 32
+    max_cache_latency: float = 0.05
+    max_error_rate: float = 0.5
+    # Mínimo de chamadas na janela para a taxa de erros ser considerada
+    min_provider_calls: int = 5
+
+
+class HealthMonitor:
+    """Coleta periodicamente as métricas de readiness e guarda o último resultado"""
+
+    def __init__(self, queue_depth: Callable[[], int], cache_probe: Callable[[], Any],
+                 provider_errors: Callable[[], Optional[tuple]],
+                 thresholds: Optional[ReadinessThresholds] = None,
+                 interval: float = 0.5, lag_samples: int = 5):
+        self._queue_depth = queue_depth
+        self._cache_probe = cache_probe
+        self._provider_errors = provider_errors
+        self.thresholds = thresholds or ReadinessThresholds()
+        self.interval = interval
+        self._lags = deque([0.0], maxlen=lag_samples)
+        self._task: Optional[asyncio.Task] = None
+        self.snapshot: Dict[str, Any] = {"ready": False, "reasons": ["monitor não iniciado"]}
+
+    def start(self):
+        if self._task is None:
+            self.sample()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            # Quanto o loop demorou além do previsto para retomar a tarefa
+            self._lags.append(max(0.0, loop.time() - expected))
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Erro ao coletar métricas de readiness: {e}")
+
+    def sample(self) -> Dict[str, Any]:
+        """Coleta as métricas, avalia os limites e atualiza o snapshot"""
+        limits = self.thresholds
+
+        start = time.perf_counter()
+        self._cache_probe()
+        cache_latency = time.perf_counter() - start
+
+        loop_lag = max(self._lags)
+        queue_depth = self._queue_depth()
+        provider = self._provider_errors()
+        error_rate, provider_calls = provider if provider else (0.0, 0)
+
+        reasons: List[str] = []
+        if loop_lag > limits.max_loop_lag:
+            reasons.append(f"atraso do event loop {loop_lag * 1000:.0f}ms")
+        if queue_depth > limits.max_queue_depth:
+            reasons.append(f"fila do pool de análise com {queue_depth} tarefas")
+        if cache_latency > limits.max_cache_latency:
+            reasons.append(f"latência do cache {cache_latency * 1000:.1f}ms")
+        if provider_calls >= limits.min_provider_calls and error_rate > limits.max_error_rate:
+            reasons.append(f"taxa de erros do provedor {error_rate:.0%}")
+
+        self.snapshot = {
+            "ready": not reasons,
+            "reasons": reasons,
+            "checked_at": time.time(),
+            "loop_lag_ms": round(loop_lag * 1000, 2),
+            "queue_depth": queue_depth,
+            "cache_latency_ms": round(cache_latency * 1000, 3),
+            "provider_error_rate": round(error_rate, 3),
+            "provider_calls": provider_calls,
+        }
+        return self.snapshot
@@ -6,16 +6,18 @@ Script para inicializar e executar a API de Análise de Texto
 import os
 import sys
 import subprocess
+import importlib.util
 from pathlib import Path
 
 def check_requirements():
-    """Verifica se os requirements estão instalados"""
+    """Verifica se os requirements estão instalados (sem importá-los)"""
     try:
-        import fastapi
-        import uvicorn
-        import google.generativeai
-        return True
-    except ImportError:
+        return all(
+            importlib.util.find_spec(module) is not None
+            for module in ("fastapi", "uvicorn", "google.generativeai")
+        )
+    except ModuleNotFoundError:
+        # Pacote pai ausente (por exemplo, nenhum pacote "google" instalado)
         return False
 
 def install_requirements():
@@ -0,0 +1,128 @@
+"""
+Classificador local de sentimento (primeiro nível)
+
+Regressão logística multinomial sobre unigramas, bigramas e prefixos de
+palavras (sem acentos) mapeados por hashing para um vetor de tamanho fixo. Os pesos ficam em
+um arquivo .npz pequeno, carregado uma única vez; um lote inteiro é pontuado
+com algumas operações vetorizadas do NumPy. Textos classificados com confiança
+acima do limite são respondidos localmente e só os incertos vão para o Gemini.
+
+O treino e a avaliação rodam offline (train_sentiment_model.py).
+"""
+
+import hashlib
+import zlib
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from analysis_store import SENTIMENT_LABELS
+from text_processing import fold_accents, tokenize
+
+DEFAULT_DIMENSIONS = 2 ** 18
+
+# Só o início de textos muito grandes é usado: a latência fica limitada
+MAX_CHARS = 10_000
+
+PREFIX_LENGTH = 5
+
+
+@lru_cache(maxsize=100_000)
+def _bucket(feature: str, dimensions: int) -> int:
+    # crc32 é estável entre processos (hash() do Python não é)
+    return zlib.crc32(feature.encode("utf-8")) % dimensions
+
+
+def extract_features(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> List[int]:
+    """Índices (com repetição) dos unigramas, bigramas e prefixos do texto no vetor de hashing"""
+    words = [fold_accents(word) for word in tokenize(text[:MAX_CHARS])]
+    features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    # Prefixos aproximam radicais: "decepcionado" e "decepcionante" compartilham "decep~"
+    features += [f"{word[:PREFIX_LENGTH]}~" for word in words if len(word) > PREFIX_LENGTH]
+    return [_bucket(feature, dimensions) for feature in features]
+
+
+def encode_batch(texts: Sequence[str], dimensions: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Retorna (índices, valores, documento de cada índice) do lote em formato esparso"""
+    indices: List[int] = []
+    lengths = np.zeros(len(texts), dtype=np.int64)
+    for position, text in enumerate(texts):
+        features = extract_features(text, dimensions)
+        indices.extend(features)
+        lengths[position] = len(features)
+    docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    # Contagens normalizadas pelo tamanho do texto (1/sqrt(n) por ocorrência)
+    values = 1.0 / np.sqrt(np.maximum(lengths, 1))[docs]
+    return np.fromiter(indices, dtype=np.int64, count=len(indices)), values, docs
+
+
+class SentimentClassifier:
+    """Regressão logística multinomial sobre n-gramas com hashing"""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray,
+                 labels: Tuple[str, ...] = SENTIMENT_LABELS):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = tuple(labels)
+        # Identifica os pesos (entra na versão das análises e na ETag)
+        self.version = hashlib.sha256(self.weights.tobytes() + self.bias.tobytes()).hexdigest()[:12]
+
+    @property
+    def dimensions(self) -> int:
+        return self.weights.shape[0]
+
+    @classmethod
+    def load(cls, path: str) -> "SentimentClassifier":
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], tuple(data["labels"].tolist()))
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+
+    def _logits(self, indices: np.ndarray, values: np.ndarray, docs: np.ndarray,
+                n_docs: int) -> np.ndarray:
+        contributions = self.weights[indices] * values[:, None].astype(np.float32)
+        logits = np.empty((n_docs, len(self.labels)), dtype=np.float64)
+        for column in range(len(self.labels)):
+            logits[:, column] = np.bincount(docs, weights=contributions[:, column], minlength=n_docs)
+        return logits + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidade de cada rótulo (colunas na ordem de labels) para cada texto"""
+        return _softmax(self._logits(*encode_batch(texts, self.dimensions), len(texts)))
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """Retorna (rótulo, confiança) de cada texto do lote"""
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[label], float(confidence))
+                for label, confidence in zip(best.tolist(), probabilities[np.arange(len(texts)), best].tolist())]
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str],
+              dimensions: int = DEFAULT_DIMENSIONS, epochs: int = 300,
+              learning_rate: float = 5.0, l2: float = 1e-4) -> "SentimentClassifier":
+        """Ajusta os pesos por gradiente descendente (lote completo) com regularização L2"""
+        model = cls(np.zeros((dimensions, len(SENTIMENT_LABELS))), np.zeros(len(SENTIMENT_LABELS)))
+        indices, values, docs = encode_batch(texts, dimensions)
+        target = np.zeros((len(texts), len(SENTIMENT_LABELS)))
+        target[np.arange(len(texts)), [SENTIMENT_LABELS.index(label) for label in labels]] = 1.0
+
+        weights = np.zeros((dimensions, len(SENTIMENT_LABELS)))
+        bias = np.zeros(len(SENTIMENT_LABELS))
+        for _ in range(epochs):
+            model.weights, model.bias = weights, bias
+            error = (_softmax(model._logits(indices, values, docs, len(texts))) - target) / len(texts)
+            gradient = np.stack([
+                np.bincount(indices, weights=values * error[docs, column], minlength=dimensions)
+                for column in range(len(SENTIMENT_LABELS))
+            ], axis=1)
+            weights = weights - learning_rate * (gradient + l2 * weights)
+            bias = bias - learning_rate * error.sum(axis=0)
+        return cls(weights, bias)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exponentials = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
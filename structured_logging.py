@@ -0,0 +1,98 @@
+"""
+Logging estruturado e amostrado
+
+Os registros podem sair como JSON (um objeto por linha, com o trace_id da
+requisição) e os logs do caminho quente passam por SampledLogger: a decisão de
+amostragem vem antes de montar a mensagem, então registros descartados não
+custam formatação nem criação de LogRecord.
+"""
+
+import json
+import logging
+import random
+from datetime import datetime, timezone
+from typing import Callable
+
+from tracing import current_trace_id
+
+LOG_FORMATS = ("text", "json")
+
+
+class JSONFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato texto com os campos estruturados e o trace_id ao final da linha"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = dict(getattr(record, "fields", None) or {})
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            fields["trace_id"] = trace_id
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return message
+
+
+class TraceIdFilter(logging.Filter):
+    """Anexa o id do trace atual a cada registro"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        return True
+
+
+def configure_logging(level: str = "INFO", log_format: str = "text"):
+    """Configura o logger raiz no formato escolhido"""
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Formato de log inválido: '{log_format}'. Use um de: {', '.join(LOG_FORMATS)}")
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceIdFilter())
+    if log_format == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(levelname)s:%(name)s:%(message)s"))
+    logging.basicConfig(level=level.upper(), handlers=[handler], force=True)
+
+
+class SampledLogger:
+    """
+    Registra só uma fração dos eventos informativos de alta frequência
+
+    Os campos vão como atributos estruturados (extra) em vez de interpolados
+    na mensagem; o evento registrado leva sample_rate para que a contagem real
+    possa ser estimada.
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = 1.0,
+                 rng: Callable[[], float] = random.random):
+        self.logger = logger
+        self.sample_rate = sample_rate
+        self._rng = rng
+
+    def info(self, message: str, **fields):
+        if self.sample_rate < 1.0 and self._rng() >= self.sample_rate:
+            return
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self.sample_rate < 1.0:
+            fields["sample_rate"] = self.sample_rate
+        self.logger.info(message, extra={"fields": fields})
+
@@ -4,10 +4,21 @@ Testes para a API de Análise de Texto
 
 import pytest
 from fastapi.testclient import TestClient
-from main import app, clean_text, get_word_frequencies, simple_sentiment_analysis
+from main import app, clean_text, get_word_frequencies, simple_sentiment_analysis, STOPWORDS
+from analysis_store import AnalysisStore
+from batch_stats import BatchStatsEngine
+from offload import AnalysisOffloader, OffloadQueueFull
+from text_processing import tokenize
+from gemini_provider import GeminiSentimentProvider, SentimentParseError, parse_sentiment_response
+import asyncio
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    """Fila de jobs dos testes com lifespan fora do diretório do repositório"""
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.db"))
+
 def test_root_endpoint():
     """Testa o endpoint raiz"""
     response = client.get("/")
@@ -175,5 +186,789 @@ def test_analyze_multiple_texts():
     data = response.json()
     assert data["cache_size"] >= len(texts)
 
+def test_analysis_store_roundtrip():
+    """Testa se o registro compacto preserva os dados da análise"""
+    store = AnalysisStore()
+    text = "Análise de ação com acentuação: ótimo, ótimo!"
+    store.put(
+        "chave", text, word_count=7,
+        word_frequencies=[("ótimo", 2), ("análise", 1)],
+        sentiment="positivo", confidence=0.85,
+        explanation="Texto positivo", timestamp="2024-01-15T10:30:00.123456"
+    )
+    record = store.get("chave")
+    
+    assert store.text_of(record) == text
+    assert record.word_count == 7
+    assert record.word_frequencies == [("ótimo", 2), ("análise", 1)]
+    assert record.sentiment == "positivo"
+    assert record.confidence == 0.85
+    assert record.explanation == "Texto positivo"
+    assert record.timestamp == "2024-01-15T10:30:00.123456"
+    
+    # Reanálise do mesmo texto não duplica o texto na arena
+    arena_size = len(store._arena)
+    store.put("chave", text, 7, [], "neutro", None, None, "2024-01-15T10:31:00")
+    assert len(store._arena) == arena_size
+    assert store.get("chave").confidence is None
+    assert len(store) == 1
+
+@pytest.mark.parametrize("mode", ["full", "zlib", "index"])
+def test_analysis_store_search_modes(mode):
+    """Testa se a busca retorna o mesmo resultado em todos os modos de armazenamento"""
+    store = AnalysisStore(mode=mode)
+    text = "Python, python e PYTHON! Pythonistas adoram a linguagem de programação."
+    store.put("chave", text, 10, [("python", 3)], "positivo", 0.8, None, "2024-01-15T10:30:00")
+    record = store.get("chave")
+    
+    assert store.count_term(record, "python") == clean_text(text).count("python")
+    assert store.count_term(record, "programação") == 1
+    assert store.count_term(record, "inexistente") == 0
+    if mode == "index":
+        assert store.text_of(record) is None
+        with pytest.raises(ValueError):
+            store.count_term(record, "linguagem de")
+    else:
+        assert store.text_of(record) == text
+        assert store.count_term(record, "linguagem de") == 1
+
+def test_index_mode_analysis_and_phrase_search(monkeypatch):
+    """Testa o índice calculado na etapa de estatísticas e a rejeição de frases no modo index"""
+    import main
+    store = AnalysisStore(mode="index")
+    # O texto não deve ser tokenizado de novo ao armazenar
+    monkeypatch.setattr(store, "_words", lambda text: pytest.fail("índice recalculado no armazenamento"))
+    monkeypatch.setattr(main, "analysis_cache", store)
+    
+    text = "Relatório de vendas: vendas cresceram e o relatório foi aprovado"
+    assert client.post("/analyze-text", json={"text": text, "language": "pt"}).status_code == 200
+    search = client.get("/search-term", params={"term": "vendas"}).json()
+    assert search["found"] and search["occurrences"] == 2
+    
+    response = client.get("/search-term", params={"term": "vendas cresceram"})
+    assert response.status_code == 400
+
+def test_compressed_mode_compresses_in_pool(monkeypatch):
+    """Testa se textos grandes são comprimidos no pool, fora do event loop"""
+    import threading
+    import main
+    import text_analysis
+    store = AnalysisStore(mode="zlib")
+    monkeypatch.setattr(main, "analysis_cache", store)
+    offloader = AnalysisOffloader(threshold=50, pool_size=1, executor="thread")
+    monkeypatch.setattr(main, "offloader", offloader)
+    threads, original = [], text_analysis.compress_text
+    
+    def compress_text(text, mode, level=6):
+        threads.append(threading.current_thread().name)
+        return original(text, mode, level)
+    
+    monkeypatch.setattr(text_analysis, "compress_text", compress_text)
+    
+    text = "Relatório de vendas aprovado. " * 5
+    response = client.post("/analyze-text", json={"text": text, "language": "pt"})
+    offloader.shutdown()
+    assert response.status_code == 200
+    assert len(threads) == 1 and threads[0].startswith("analysis")
+    assert store.text_of(store.get(main.text_digest(text.strip(), "pt"))) == text.strip()
+
+def test_analysis_store_invalid_mode():
+    """Testa a rejeição de modo de armazenamento desconhecido"""
+    with pytest.raises(ValueError):
+        AnalysisStore(mode="gzip")
+
+def test_batch_engine_matches_word_frequencies():
+    """Testa se o motor em lote reproduz get_word_frequencies, inclusive desempates"""
+    import random
+    rng = random.Random(0)
+    vocabulary = ["python", "java", "rust", "api", "de", "é", "não", "ótimo", "código", "ab", "Dados"]
+    texts = [
+        " ".join(rng.choice(vocabulary) + rng.choice(["", ",", "!", "."]) for _ in range(rng.randint(0, 30)))
+        for _ in range(200)
+    ] + ["", "!!!", "python java python javascript java"]
+    engine = BatchStatsEngine(STOPWORDS)
+    
+    for exclude_stopwords in (True, False):
+        expected = [
+            [(wf.word, wf.frequency) for wf in get_word_frequencies(text, exclude_stopwords)]
+            for text in texts
+        ]
+        assert engine.word_frequencies(texts, exclude_stopwords=exclude_stopwords) == expected
+    assert engine.analyze(texts).word_counts == [len(clean_text(text).split()) for text in texts]
+
+def test_batch_engine_vocabulary_is_bounded():
+    """Testa se o vocabulário é reconstruído ao atingir o limite, sem mudar o resultado"""
+    engine = BatchStatsEngine(STOPWORDS, max_vocabulary=50)
+    for batch in range(20):
+        texts = [f"palavra{batch}x{i} palavra{batch}x{i} comum" for i in range(10)]
+        expected = [[(wf.word, wf.frequency) for wf in get_word_frequencies(text)] for text in texts]
+        assert engine.word_frequencies(texts) == expected
+        assert engine.vocabulary_size <= 50 + len(texts) * 2
+    assert engine.vocabulary_resets > 0
+
+def test_batch_gemini_calls_are_bounded(monkeypatch):
+    """Testa se as chamadas ao Gemini de um lote respeitam GEMINI_BATCH_CONCURRENCY"""
+    import main
+    
+    class SlowModel:
+        active = peak = 0
+        
+        async def generate_content_async(self, prompt):
+            SlowModel.active += 1
+            SlowModel.peak = max(SlowModel.peak, SlowModel.active)
+            await asyncio.sleep(0.005)
+            SlowModel.active -= 1
+            return type("Response", (), {"text": '{"sentiment": "neutro", "confidence": 0.5, "explanation": "ok"}'})()
+    
+    monkeypatch.setattr(main, "sentiment_provider", GeminiSentimentProvider(SlowModel()))
+    monkeypatch.setattr(main, "sentiment_model", None)
+    
+    async def run():
+        monkeypatch.setattr(main, "batch_provider_slots", asyncio.Semaphore(3))
+        texts = [f"texto {i}" for i in range(20)]
+        return await main.sentiment_results(texts, ["pt"] * len(texts))
+    
+    results = asyncio.run(run())
+    assert len(results) == 20 and all(result[0] == "neutro" for result, _ in results)
+    assert SlowModel.peak == 3
+
+def test_analyze_batch():
+    """Testa a análise em lote"""
+    texts = ["Python é incrível e Python é rápido", "Este projeto tem muitos problemas"]
+    response = client.post("/analyze-batch", json={"texts": texts})
+    assert response.status_code == 200
+    
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["most_frequent_words"][0] == {"word": "python", "frequency": 2}
+    assert results[1]["word_count"] == 5
+    
+    # Lote vazio ou com texto vazio é rejeitado
+    assert client.post("/analyze-batch", json={"texts": []}).status_code == 422
+    assert client.post("/analyze-batch", json={"texts": ["ok", " "]}).status_code == 422
+
+def test_offloader_dispatch_by_size():
+    """Testa se textos pequenos rodam inline e grandes vão para o pool"""
+    offloader = AnalysisOffloader(threshold=10, pool_size=1, executor="process")
+    try:
+        assert asyncio.run(offloader.run(tokenize, "Olá mundo")) == ["olá", "mundo"]
+        assert asyncio.run(offloader.run(tokenize, "Texto bem maior, para o pool")) == \
+            ["texto", "bem", "maior", "para", "o", "pool"]
+        metrics = offloader.metrics()
+        assert metrics["inline"] == 1
+        assert metrics["offloaded"] == 1
+        assert metrics["pool_started"] is True
+        assert metrics["in_flight"] == 0
+    finally:
+        offloader.shutdown()
+
+def test_offloader_worker_configuration():
+    """Testa se os workers do pool recebem a configuração de normalização pelo initializer"""
+    from text_analysis import compute_text_statistics, configure_normalization
+    offloader = AnalysisOffloader(threshold=1, pool_size=1, executor="process",
+                                  initializer=configure_normalization, initargs=(True, 128))
+    try:
+        # O processo dos testes segue sem normalização; o worker normaliza
+        assert compute_text_statistics("Ações e ações", "pt")[1] == ("ações",)
+        assert asyncio.run(offloader.run(compute_text_statistics, "Ações e ações", "pt")) == \
+            (3, ("acao",), (2,), None)
+    finally:
+        offloader.shutdown()
+
+def test_offloader_rejects_when_queue_full():
+    """Testa a rejeição quando a fila do pool está cheia"""
+    offloader = AnalysisOffloader(threshold=1, pool_size=1, max_queue=0, executor="thread")
+    offloader.in_flight = 1
+    with pytest.raises(OffloadQueueFull):
+        asyncio.run(offloader.run(tokenize, "texto"))
+    assert offloader.metrics()["rejected"] == 1
+
+def test_analyze_large_text_offloaded(monkeypatch):
+    """Testa se textos acima do limite produzem o mesmo resultado via pool"""
+    import main
+    offloader = AnalysisOffloader(threshold=50, pool_size=1, executor="thread")
+    monkeypatch.setattr(main, "offloader", offloader)
+    text = "Python é incrível. " * 10
+    response = client.post("/analyze-text", json={"text": text})
+    offloader.shutdown()
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["word_count"] == len(clean_text(text).split())
+    assert data["most_frequent_words"] == [
+        {"word": wf.word, "frequency": wf.frequency} for wf in get_word_frequencies(text)
+    ]
+    assert offloader.offloaded >= 1
+
+def test_analyze_batch_offloads_large_texts(monkeypatch):
+    """Testa se textos grandes de um lote vão para o pool e a fila cheia responde 503"""
+    import main
+    offloader = AnalysisOffloader(threshold=50, pool_size=1, executor="thread")
+    monkeypatch.setattr(main, "offloader", offloader)
+    large = "Python é incrível. " * 10
+    response = client.post("/analyze-batch", json={"texts": [large, "Python é rápido"]})
+    offloader.shutdown()
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["most_frequent_words"] == [
+        {"word": wf.word, "frequency": wf.frequency} for wf in get_word_frequencies(large)
+    ]
+    assert results[1]["word_count"] == 3
+    assert offloader.offloaded >= 1
+    
+    full = AnalysisOffloader(threshold=50, pool_size=1, max_queue=0, executor="thread")
+    full.in_flight = 1
+    monkeypatch.setattr(main, "offloader", full)
+    rejected = client.post("/analyze-batch", json={"texts": [large, "Python é rápido"]})
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+
+def test_parse_sentiment_response():
+    """Testa o parser estrito da resposta JSON do Gemini"""
+    assert parse_sentiment_response('{"sentiment": "positivo", "confidence": 0.9, "explanation": "ok"}') == \
+        ("positivo", 0.9, "ok")
+    
+    invalid_responses = [
+        '```json\n{"sentiment": "positivo", "confidence": 0.9, "explanation": "ok"}\n```',
+        '{"sentiment": "feliz", "confidence": 0.9, "explanation": "ok"}',
+        '{"sentiment": "positivo", "confidence": 1.5, "explanation": "ok"}',
+        '{"sentiment": "positivo", "confidence": true, "explanation": "ok"}',
+        '{"sentiment": "positivo", "confidence": 0.9}',
+        '[]',
+    ]
+    for raw in invalid_responses:
+        with pytest.raises(SentimentParseError):
+            parse_sentiment_response(raw)
+
+class FakeGeminiModel:
+    """Modelo falso que devolve respostas pré-definidas"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+    
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return type("Response", (), {"text": response})()
+
+def test_gemini_provider_metrics_and_fallback(monkeypatch):
+    """Testa o envio apenas do texto, as métricas e o fallback em respostas inválidas"""
+    import main
+    fake_model = FakeGeminiModel(
+        '{"sentiment": "negativo", "confidence": 0.8, "explanation": "Reclamação"}',
+        'resposta sem JSON',
+        RuntimeError("timeout"),
+    )
+    provider = GeminiSentimentProvider(fake_model)
+    monkeypatch.setattr(main, "sentiment_provider", provider)
+    
+    text = "Este projeto é ótimo e fantástico"
+    result = asyncio.run(main.analyze_sentiment_with_gemini(text))
+    assert (result.sentiment, result.confidence) == ("negativo", 0.8)
+    assert fake_model.prompts == [text]
+    
+    # Resposta inválida e erro do SDK caem na análise local
+    for _ in range(2):
+        result = asyncio.run(main.analyze_sentiment_with_gemini(text))
+        assert result == simple_sentiment_analysis(text)
+    
+    metrics = provider.metrics()
+    assert (metrics["calls"], metrics["parse_failures"], metrics["errors"]) == (3, 1, 1)
+
+def test_lifespan_warm_up_marks_ready():
+    """Testa se o warm-up da subida deixa a aplicação pronta"""
+    with TestClient(app) as warm_client:
+        data = warm_client.get("/health").json()
+    assert data["ready"] is True
+
+def test_liveness_and_readiness_probes():
+    """Testa /livez e /readyz antes e depois do warm-up"""
+    import main
+    assert client.get("/livez").json() == {"status": "alive"}
+    
+    with TestClient(app) as warm_client:
+        response = warm_client.get("/readyz")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert "loop_lag_ms" in data and "queue_depth" in data
+    
+    main.startup_state["ready"] = False
+    try:
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["warm-up não concluído"]
+    finally:
+        main.startup_state["ready"] = True
+
+def test_health_monitor_thresholds():
+    """Testa se o monitor marca o worker como não pronto acima dos limites"""
+    from probes import HealthMonitor, ReadinessThresholds
+    state = {"queue": 0, "errors": (0.0, 0)}
+    monitor = HealthMonitor(
+        queue_depth=lambda: state["queue"],
+        cache_probe=lambda: None,
+        provider_errors=lambda: state["errors"],
+        thresholds=ReadinessThresholds(max_queue_depth=4, max_error_rate=0.5, min_provider_calls=5)
+    )
+    assert monitor.sample()["ready"] is True
+    
+    # Poucas chamadas ainda não bastam para tirar o worker do ar
+    state["errors"] = (1.0, 2)
+    assert monitor.sample()["ready"] is True
+    
+    state["queue"], state["errors"] = 5, (0.8, 10)
+    snapshot = monitor.sample()
+    assert snapshot["ready"] is False
+    assert len(snapshot["reasons"]) == 2
+
+def test_gemini_provider_error_rate():
+    """Testa a taxa de erros móvel do provedor"""
+    provider = GeminiSentimentProvider(FakeGeminiModel(
+        '{"sentiment": "neutro", "confidence": 0.5, "explanation": "ok"}',
+        RuntimeError("timeout"),
+        'resposta sem JSON',
+    ))
+    asyncio.run(provider.analyze("texto"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(provider.analyze("texto"))
+    assert provider.error_rate() == (0.5, 2)
+    
+    # Resposta fora do schema também é falha
+    with pytest.raises(SentimentParseError):
+        asyncio.run(provider.analyze("texto"))
+    assert provider.error_rate() == (2 / 3, 3)
+    
+    provider.error_window = 0
+    assert provider.error_rate() == (0.0, 0)
+
+def test_adaptive_limiter_aimd():
+    """Testa o crescimento aditivo e a redução multiplicativa do limite"""
+    from admission import Admission, AdaptiveConcurrencyLimiter
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, latency_target=1.0, backoff=0.5)
+    
+    for _ in range(4):
+        assert limiter.admit() is Admission.ADMITTED
+    assert limiter.admit() is Admission.REJECTED
+    
+    # Latências dentro da meta aumentam o limite aos poucos
+    limiter.release(0.1)
+    assert 4 < limiter.limit < 5
+    
+    # Latências acima da meta derrubam o limite, respeitando o mínimo
+    for _ in range(3):
+        limiter.release(5.0)
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+def test_analyze_text_admission_control(monkeypatch):
+    """Testa rejeição com Retry-After e o caminho degradado acima do limite"""
+    import main
+    from admission import AdaptiveConcurrencyLimiter
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, degrade_ratio=0.0)
+    limiter.in_flight = 1
+    monkeypatch.setattr(main, "admission_limiter", limiter)
+    text = "Este projeto é fantástico e maravilhoso"
+    
+    response = client.post("/analyze-text", json={"text": text})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == main.ADMISSION_RETRY_AFTER
+    
+    limiter.degrade_ratio = 1.0
+    response = client.post("/analyze-text", json={"text": text})
+    assert response.status_code == 200
+    assert response.headers["X-Analysis-Degraded"] == "true"
+    assert response.json()["sentiment_analysis"]["sentiment"] == "positivo"
+    assert limiter.metrics()["rejected"] == 1
+    assert limiter.metrics()["degraded"] == 1
+    assert limiter.in_flight == 1
+
+def test_fast_response_matches_response_model():
+    """Testa se a resposta serializada diretamente segue o TextAnalysisResponse"""
+    from main import TextAnalysisResponse, BatchAnalysisResponse
+    text = "Análise rápida: ótimo, ótimo e excelente!"
+    response = client.post("/analyze-text", json={"text": text})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    
+    data = response.json()
+    assert TextAnalysisResponse.model_validate(data).model_dump() == data
+    assert data["most_frequent_words"][0] == {"word": "ótimo", "frequency": 2}
+    
+    batch = client.post("/analyze-batch", json={"texts": [text]}).json()
+    assert BatchAnalysisResponse.model_validate(batch).model_dump() == batch
+    
+    # O esquema da resposta continua documentado no OpenAPI
+    schema = client.get("/openapi.json").json()
+    responses = schema["paths"]["/analyze-text"]["post"]["responses"]["200"]
+    assert responses["content"]["application/json"]["schema"]["$ref"].endswith("TextAnalysisResponse")
+
+def test_analysis_etag_and_conditional_get():
+    """Testa ETag em /analyze-text e GET /analyses/{digest} com If-None-Match"""
+    import main
+    text = "Texto para cache HTTP: o serviço é excelente"
+    digest = main.text_digest(text, "pt")
+    
+    response = client.post("/analyze-text", json={"text": f"  {text}  "})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert digest in etag
+    assert response.headers["Content-Location"] == f"/analyses/{digest}"
+    
+    # Busca pelo digest sem reenviar o texto
+    cached = client.get(f"/analyses/{digest}")
+    assert cached.status_code == 200
+    assert cached.headers["ETag"] == etag
+    assert cached.json() == response.json()
+    
+    # A ETag vem de quem produziu o registro: fallback por palavras-chave não se passa pelo Gemini
+    source = main.analysis_cache.get(digest).version
+    assert etag == main.analysis_etag(digest, source)
+    assert main.analysis_etag(digest, "gemini/v1;pt") != main.analysis_etag(digest, f"{main.KEYWORDS_SOURCE};pt")
+    
+    # Revalidação: 304 sem corpo no GET; POST ignora If-None-Match e analisa de novo
+    not_modified = client.get(f"/analyses/{digest}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    repeated = client.post("/analyze-text", json={"text": text}, headers={"If-None-Match": f'"outra", {etag}'})
+    assert repeated.status_code == 200
+    assert repeated.json()["word_count"] == response.json()["word_count"]
+    
+    # ETag diferente: devolve a análise completa
+    assert client.get(f"/analyses/{digest}", headers={"If-None-Match": 'W/"antiga"'}).status_code == 200
+    assert client.get(f"/analyses/{'0' * 64}").status_code == 404
+
+def test_analysis_digest_language_and_normalization(monkeypatch):
+    """Testa que idioma e normalização entram no digest e na ETag"""
+    import main
+    text = "The app is great and the support team is great"
+    english = client.post("/analyze-text", json={"text": text, "language": "en"})
+    portuguese = client.post("/analyze-text", json={"text": text, "language": "pt"})
+    assert english.headers["ETag"] != portuguese.headers["ETag"]
+    assert english.headers["Content-Location"] != portuguese.headers["Content-Location"]
+    
+    # A análise em português não sobrescreve a em inglês
+    cached = client.get(english.headers["Content-Location"])
+    assert cached.json() == english.json()
+    assert "the" not in [item["word"] for item in cached.json()["most_frequent_words"]]
+    assert main.analysis_cache.get(main.text_digest(text, "en")).version.endswith(";en")
+    
+    # Com normalização ativada o digest muda
+    plain = main.text_digest(text, "en")
+    monkeypatch.setattr(main, "text_normalizer", object())
+    assert main.text_digest(text, "en") != plain
+    assert main.analysis_version("palavras-chave", "en") == "palavras-chave;en+normalizado"
+
+def test_async_jobs(monkeypatch, tmp_path):
+    """Testa POST /jobs e GET /jobs/{id}, com a fila em SQLite"""
+    import time
+    import main
+    from jobs import JobManager, JobStore
+    manager = JobManager(JobStore(str(tmp_path / "jobs.db")), main.process_job, workers=2)
+    monkeypatch.setattr(main, "job_manager", manager)
+    
+    with TestClient(app) as lifespan_client:
+        created = lifespan_client.post("/jobs", json={"texts": ["O serviço é excelente", "Produto ruim"]})
+        assert created.status_code == 202
+        job = created.json()
+        assert job["status"] == "queued"
+        assert created.headers["Location"] == job["status_url"] == f"/jobs/{job['job_id']}"
+        
+        for _ in range(100):
+            status = lifespan_client.get(job["status_url"]).json()
+            if status["status"] == "done":
+                break
+            time.sleep(0.01)
+        assert status["status"] == "done"
+        assert len(status["result"]["results"]) == 2
+        assert status["result"]["results"][0]["word_count"] == 4
+        
+        # O resultado também fica disponível pelo digest
+        digest = status["result"]["digests"][1]
+        assert lifespan_client.get(f"/analyses/{digest}").json() == status["result"]["results"][1]
+        
+        assert lifespan_client.get("/jobs/inexistente").status_code == 404
+        assert lifespan_client.post("/jobs", json={"text": "a", "texts": ["b"]}).status_code == 422
+        assert lifespan_client.post("/jobs", json={"texts": []}).status_code == 422
+
+def test_jobs_recovered_after_restart(tmp_path):
+    """Testa leases: só jobs com lease expirado são retomados e cada job tem um único dono"""
+    from jobs import DONE, RUNNING, JobManager, JobQueueFull, JobStore
+    path = str(tmp_path / "jobs.db")
+    
+    async def handler(payload):
+        return {"texts": len(payload["texts"])}
+    
+    async def scenario():
+        # Um job de um processo que caiu (lease expirado) e outro em execução em um processo vivo
+        store = JobStore(path)
+        live = store.create({"texts": ["c"]})
+        assert store.claim("vivo", lease=60) == live
+        crashed = store.create({"texts": ["a", "b"]})
+        assert store.claim("caiu", lease=-1) == crashed
+        assert store.claim("outro", lease=60) == crashed
+        # Reivindicação atômica: com o lease válido, ninguém mais leva o job
+        assert JobStore(path).claim("mais-um", lease=60) is None
+        # O dono antigo perdeu o lease e não grava resultado
+        assert not store.finish(crashed, "caiu", DONE, result={})
+        store.release(crashed, "outro")
+        
+        manager = JobManager(JobStore(path), handler, workers=1, max_queue=1, poll_interval=0.01)
+        await manager.start()
+        for _ in range(100):
+            if manager.get(crashed)["status"] == DONE:
+                break
+            await asyncio.sleep(0.01)
+        assert manager.get(crashed)["result"] == {"texts": 2}
+        # O job do processo vivo não é tocado
+        assert manager.get(live)["status"] == RUNNING
+        assert store.finish(live, "vivo", DONE, result={"texts": 1})
+        await manager.stop()
+        
+        # A fila cheia é contada no SQLite, somando os jobs de todos os processos
+        store.create({"texts": ["d"]})
+        with pytest.raises(JobQueueFull):
+            manager.submit({"texts": ["e"]})
+        store.close()
+    
+    asyncio.run(scenario())
+
+def test_job_workers_survive_store_errors(tmp_path):
+    """Testa que erros transitórios do SQLite não derrubam os workers nem perdem jobs"""
+    import sqlite3
+    from jobs import DONE, JobManager, JobStore
+    
+    class FlakyStore(JobStore):
+        failures = {"claim": 2, "finish": 1}
+        
+        def _flaky(self, name):
+            if self.failures[name]:
+                self.failures[name] -= 1
+                raise sqlite3.OperationalError("database is locked")
+        
+        def claim(self, owner, lease):
+            self._flaky("claim")
+            return super().claim(owner, lease)
+        
+        def finish(self, *args, **kwargs):
+            self._flaky("finish")
+            return super().finish(*args, **kwargs)
+    
+    async def handler(payload):
+        return {"texts": len(payload["texts"])}
+    
+    async def scenario():
+        manager = JobManager(FlakyStore(str(tmp_path / "jobs.db")), handler, workers=2,
+                             poll_interval=0.01, retry_backoff=0.01)
+        await manager.start()
+        await asyncio.sleep(0.05)
+        job_id = manager.submit({"texts": ["a"]})
+        for _ in range(100):
+            if manager.get(job_id)["status"] == DONE:
+                break
+            await asyncio.sleep(0.01)
+        assert manager.get(job_id)["result"] == {"texts": 1}
+        assert all(not task.done() for task in manager._tasks)
+        assert manager.metrics()["store_errors"] == 3
+        await manager.stop()
+    
+    asyncio.run(scenario())
+
+def test_jobs_purged_while_running(tmp_path):
+    """Testa que jobs concluídos são removidos periodicamente, sem reiniciar o processo"""
+    from jobs import JobManager, JobStore
+    
+    async def handler(payload):
+        return {}
+    
+    async def scenario():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.db")), handler, workers=1, retention=0,
+                             poll_interval=0.01, purge_interval=0.02)
+        await manager.start()
+        job_id = manager.submit({"texts": ["a"]})
+        for _ in range(100):
+            job = manager.get(job_id)
+            if job is None:
+                break
+            await asyncio.sleep(0.01)
+        assert job is None and manager.metrics()["purged"] == 1
+        await manager.stop()
+    
+    asyncio.run(scenario())
+
+def test_language_detection():
+    """Testa a detecção de idioma por trigramas de caracteres"""
+    from languages import DEFAULT_LANGUAGE, detect_language
+    assert detect_language("O produto é excelente, recomendo a todos") == "pt"
+    assert detect_language("I could not access my account today") == "en"
+    assert detect_language("Este sistema está lleno de errores y nadie lo arregla") == "es"
+    # Sem palavras reconhecíveis: idioma padrão
+    assert detect_language("123 456") == DEFAULT_LANGUAGE
+
+def test_analyze_text_language():
+    """Testa stopwords e léxico por idioma em /analyze-text"""
+    text = "The app is great and the support team is great, but the app has a bug"
+    data = client.post("/analyze-text", json={"text": text}).json()
+    words = [item["word"] for item in data["most_frequent_words"]]
+    assert words[:2] == ["app", "great"]
+    assert "the" not in words and "and" not in words
+    
+    # Idioma informado pelo cliente dispensa a detecção
+    forced = client.post("/analyze-text", json={"text": text, "language": "pt"}).json()
+    assert [item["word"] for item in forced["most_frequent_words"]][0] == "the"
+    
+    assert client.post("/analyze-text", json={"text": text, "language": "xx"}).status_code == 422
+    batch = client.post("/analyze-batch", json={"texts": [text, "El servicio es excelente"]}).json()
+    assert batch["results"][0]["most_frequent_words"] == data["most_frequent_words"]
+    assert simple_sentiment_analysis("Excellent service, I am happy", "en").sentiment == "positivo"
+
+def test_text_normalization(monkeypatch):
+    """Testa remoção de acentos e stemmer leve compartilhados por frequências, busca e léxico"""
+    import main
+    from text_processing import TextNormalizer, fold_accents, light_stem
+    assert [light_stem(word) for word in ("problemas", "ações", "papéis", "bons", "lápis")] == \
+        ["problema", "ação", "papel", "bom", "lápis"]
+    assert fold_accents("Não é solução") == "Nao e solucao"
+    
+    import text_analysis
+    normalizer = TextNormalizer(cache_size=128)
+    monkeypatch.setattr(main, "text_normalizer", normalizer)
+    monkeypatch.setattr(text_analysis, "_normalizer", normalizer)
+    monkeypatch.setattr(main, "_batch_engines", {})
+    monkeypatch.setattr(main, "analysis_cache", AnalysisStore(normalize=normalizer.normalize))
+    text_analysis.language_profile.cache_clear()
+    try:
+        text = "Os problemas continuam: cada problema gera outro problema e nenhuma solução"
+        data = client.post("/analyze-text", json={"text": text, "language": "pt"}).json()
+        assert data["most_frequent_words"][0] == {"word": "problema", "frequency": 3}
+        batch = client.post("/analyze-batch", json={"texts": [text, "Outro texto"], "language": "pt"}).json()
+        assert batch["results"][0]["most_frequent_words"] == data["most_frequent_words"]
+        
+        # Plural e acentos no termo de busca encontram a forma normalizada
+        search = client.get("/search-term", params={"term": "Soluções"}).json()
+        assert search["found"] and search["occurrences"] == 1
+        
+        # "defeitos" usa a entrada "defeito" do léxico
+        assert simple_sentiment_analysis("Vários defeitos").sentiment == "negativo"
+        assert normalizer.metrics()["cache_hit_rate"] > 0
+    finally:
+        text_analysis.language_profile.cache_clear()
+
+def test_sentiment_model_first_tier(monkeypatch, tmp_path):
+    """Testa o classificador local: pesos em .npz, resposta local e escalonamento ao Gemini"""
+    import main
+    from sentiment_model import SentimentClassifier
+    texts = ["produto excelente adorei", "ótimo atendimento adorei", "péssimo produto quebrado",
+             "horrível atendimento quebrado", "pedido chegou hoje", "reunião marcada hoje"]
+    labels = ["positivo", "positivo", "negativo", "negativo", "neutro", "neutro"]
+    SentimentClassifier.train(texts, labels, dimensions=2 ** 12).save(str(tmp_path / "model.npz"))
+    model = SentimentClassifier.load(str(tmp_path / "model.npz"))
+    assert [label for label, _ in model.predict(texts)] == labels
+    
+    fake_model = FakeGeminiModel('{"sentiment": "neutro", "confidence": 0.6, "explanation": "Incerto"}')
+    monkeypatch.setattr(main, "sentiment_provider", GeminiSentimentProvider(fake_model))
+    monkeypatch.setattr(main, "sentiment_model", model)
+    monkeypatch.setattr(main, "SENTIMENT_MODEL_THRESHOLD", 0.6)
+    
+    # Texto conhecido é respondido localmente; texto sem n-gramas conhecidos vai para o Gemini
+    monkeypatch.setattr(main, "sentiment_tiers", {"answered_locally": 0, "escalated": 0})
+    results = asyncio.run(main.sentiment_results(["Adorei, produto excelente!", "xyz qwe"], ["pt", "pt"]))
+    (label, confidence, explanation), source = results[0]
+    assert label == "positivo" and confidence >= 0.6
+    assert explanation.startswith("Classificador local")
+    assert source == f"local-{model.version}"
+    assert results[1] == (("neutro", 0.6, "Incerto"), main.sentiment_provider.version)
+    assert fake_model.prompts == ["xyz qwe"]
+    assert main.sentiment_tiers == {"answered_locally": 1, "escalated": 1}
+    # Caminho degradado: o incerto não chega ao Gemini e não conta como escalonado
+    assert main.model_sentiments(["xyz qwe"]) == [None]
+    assert main.sentiment_tiers["escalated"] == 1
+
+def test_tracing_slow_traces(monkeypatch):
+    """Testa o X-Trace-Id e os spans das etapas em /debug/traces"""
+    import main
+    monkeypatch.setattr(main.tracer, "slow_threshold", 0.0)
+    
+    response = client.post("/analyze-text", json={"text": "Rastreamento de uma análise lenta"},
+                           headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-trace-id"] == "req-123"
+    assert client.get("/search-term", params={"term": "análise"}).headers["x-trace-id"]
+    
+    traces = client.get("/debug/traces").json()["traces"]
+    trace = next(t for t in traces if t["trace_id"] == "req-123")
+    assert trace["name"] == "POST /analyze-text"
+    assert trace["attributes"]["status"] == 200
+    spans = [s["name"] for s in trace["spans"]]
+    assert {"detect_language", "statistics", "store"} <= set(spans)
+    assert all(s["duration_ms"] <= trace["duration_ms"] for s in trace["spans"])
+    
+    # GET /analyses/{digest} registra a busca no cache e a serialização
+    location = response.headers["Content-Location"]
+    client.get(location, headers={"X-Request-ID": "req-456"})
+    trace = next(t for t in client.get("/debug/traces").json()["traces"] if t["trace_id"] == "req-456")
+    assert [s["name"] for s in trace["spans"]] == ["cache_lookup", "serialize"]
+
+def test_structured_sampled_logging():
+    """Testa o formato JSON com trace_id e a amostragem dos logs do caminho quente"""
+    import json
+    import logging
+    from structured_logging import JSONFormatter, SampledLogger, TraceIdFilter
+    from tracing import Tracer
+    
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    handler.addFilter(TraceIdFilter())
+    test_logger = logging.getLogger("test_sampled")
+    test_logger.addHandler(handler)
+    test_logger.setLevel(logging.INFO)
+    try:
+        draws = iter([0.05, 0.5, 0.09, 0.99])
+        sampled = SampledLogger(test_logger, sample_rate=0.1, rng=lambda: next(draws))
+        with Tracer().trace("teste", "abc") as trace:
+            for _ in range(4):
+                sampled.info("Análise realizada", words=10)
+        assert len(records) == 2
+        entry = json.loads(JSONFormatter().format(records[0]))
+        assert entry["message"] == "Análise realizada"
+        assert entry["words"] == 10 and entry["sample_rate"] == 0.1
+        assert entry["trace_id"] == trace.trace_id == "abc"
+    finally:
+        test_logger.removeHandler(handler)
+
+def test_loadgen_open_loop_report(monkeypatch):
+    """Testa o gerador de carga contra a aplicação local com Gemini simulado"""
+    import httpx
+    import main
+    from loadgen import ANALYZE_PATH, SEARCH_PATH, StubGeminiModel, build_plan, check_limits, run_load
+    monkeypatch.setattr(main, "sentiment_provider", GeminiSentimentProvider(StubGeminiModel(0.01)))
+    monkeypatch.setattr(main, "sentiment_model", None)
+    
+    plan = build_plan(40, search_ratio=0.25, duplicate_ratio=0.5, seed=7)
+    assert plan == build_plan(40, search_ratio=0.25, duplicate_ratio=0.5, seed=7)
+    texts = [params["text"] for path, params, _ in plan if path == ANALYZE_PATH]
+    assert sum(duplicate for _, _, duplicate in plan) == len(texts) - len(set(texts)) > 0
+    
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+            return await run_load(client, plan, rate=200)
+    
+    report = asyncio.run(run())
+    assert report["requests"] == 40 and report["error_rate"] == 0.0
+    # Malha aberta: 40 chegadas a 200/s levam pelo menos 195 ms
+    assert report["duration_s"] >= 0.195
+    assert set(report["endpoints"]) == {ANALYZE_PATH, SEARCH_PATH}
+    latency = report["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    # Análises incluem a latência simulada do Gemini
+    assert report["endpoints"][ANALYZE_PATH]["latency_ms"]["p50"] >= 10
+    assert check_limits(report, max_p99_ms=latency["p99"], max_error_rate=0.0) == []
+    assert check_limits(report, max_p99_ms=0.001, max_error_rate=None)
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,181 @@
+"""
+Análise local de um texto: estatísticas de palavras e sentimento por palavras-chave
+
+São as funções executadas pelo pool de análise (offload.py). Com spawn, cada
+worker importa só este módulo, text_processing, languages, tracing e
+analysis_store (compressão do texto); main não é
+importado, então fila de jobs, logging, tracer e exportador OTLP existem apenas
+no processo da API. A normalização opcional das palavras é configurada por
+configure_normalization(), chamada por main na importação e pelo initializer
+de cada worker do pool.
+"""
+
+import re
+from collections import Counter
+from dataclasses import replace
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+from analysis_store import compress_text
+from languages import DEFAULT_LANGUAGE, LanguageProfile, get_profile
+from text_processing import TextNormalizer, tokenize
+from tracing import span
+
+# (sentimento, confiança, explicação)
+SentimentResult = Tuple[str, Optional[float], Optional[str]]
+
+# (palavras, contagens) de um texto, guardados no lugar do texto no modo index do cache
+TextIndex = Tuple[Tuple[str, ...], Tuple[int, ...]]
+
+# Texto preparado para o modo de armazenamento: índice (index) ou texto comprimido (zlib/zstd)
+TextPayload = Union[TextIndex, bytes]
+
+_normalizer: Optional[TextNormalizer] = None
+
+
+def configure_normalization(enabled: bool = False, cache_size: int = 50_000) -> Optional[TextNormalizer]:
+    """Ativa ou desativa a normalização das palavras neste processo"""
+    global _normalizer
+    _normalizer = TextNormalizer(cache_size=cache_size) if enabled else None
+    language_profile.cache_clear()
+    return _normalizer
+
+
+@lru_cache(maxsize=None)
+def language_profile(language: str) -> LanguageProfile:
+    """Perfil do idioma com stopwords e léxicos na mesma normalização das palavras do texto"""
+    profile = get_profile(language)
+    if _normalizer is None:
+        return profile
+
+    def normalized(words):
+        return frozenset(_normalizer.normalize_words(words, language))
+
+    return replace(
+        profile,
+        stopwords=normalized(profile.stopwords),
+        positive_words=normalized(profile.positive_words),
+        negative_words=normalized(profile.negative_words),
+        negative_patterns=tuple(
+            _normalizer.normalize_phrase(pattern, language) for pattern in profile.negative_patterns
+        )
+    )
+
+
+def normalize_words(words: List[str], language: str = DEFAULT_LANGUAGE) -> List[str]:
+    """Aplica a normalização às palavras, quando ativada"""
+    if _normalizer is None:
+        return words
+    return _normalizer.normalize_words(words, language)
+
+
+def clean_text(text: str) -> str:
+    """Remove pontuação e converte para minúsculas"""
+    # Remove pontuação e caracteres especiais, mantém apenas letras e espaços
+    cleaned = re.sub(r'[^\w\s]', ' ', text.lower())
+    # Remove espaços extras
+    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    return cleaned
+
+
+def count_top_words(words: List[str], exclude_stopwords: bool = True,
+                    language: str = DEFAULT_LANGUAGE) -> List[Tuple[str, int]]:
+    """Retorna as 5 palavras mais frequentes como pares (palavra, frequência)"""
+    if exclude_stopwords:
+        stopwords = language_profile(language).stopwords
+        words = [word for word in words if word not in stopwords and len(word) > 2]
+
+    word_counts = Counter(words)
+
+    # Retorna as 5 palavras mais frequentes
+    return word_counts.most_common(5)
+
+
+def compute_text_statistics(text: str, language: str = DEFAULT_LANGUAGE, storage_mode: str = "full",
+                            compression_level: int = 6
+                            ) -> Tuple[int, Tuple[str, ...], Tuple[int, ...], Optional[TextPayload]]:
+    """
+    Calcula (contagem de palavras, palavras mais frequentes, frequências, payload)
+
+    O payload é o texto preparado para o modo de armazenamento do cache: o
+    índice de palavras no modo index ou o texto comprimido nos modos zlib/zstd
+    (None no modo full). Contar todas as palavras ou comprimir acontece aqui,
+    no pool quando o texto é grande, e não no event loop ao armazenar. Retorna
+    apenas tipos básicos para que o resultado seja barato de transferir entre
+    processos.
+    """
+    # tokenize equivale a clean_text(text).split(), com uma única passada de regex
+    with span("tokenize"):
+        words = tokenize(text)
+    with span("frequencies"):
+        most_common = count_top_words(normalize_words(words, language), language=language)
+    payload = None
+    if storage_mode == "index":
+        # Mesma forma das palavras usada pela busca (normalização do idioma padrão)
+        with span("index"):
+            counts = Counter(normalize_words(words))
+            payload = (tuple(counts), tuple(counts.values()))
+    elif storage_mode in ("zlib", "zstd"):
+        with span("compress"):
+            payload = compress_text(text, storage_mode, compression_level)
+    return len(words), tuple(word for word, _ in most_common), tuple(freq for _, freq in most_common), payload
+
+
+def compute_simple_sentiment(text: str, language: str = DEFAULT_LANGUAGE) -> SentimentResult:
+    """
+    Análise de sentimento por palavras-chave com resultado em tupla
+
+    Tipos básicos mantêm o resultado barato de serializar e de transferir
+    quando a função roda no pool de análise. Os léxicos vêm do perfil do idioma,
+    montado uma única vez.
+    """
+    profile = language_profile(language)
+    positive_words = profile.positive_words
+    negative_words = profile.negative_words
+    negative_patterns = profile.negative_patterns
+
+    text_lower = clean_text(text)
+    if _normalizer is not None:
+        # Padrões e léxicos também estão normalizados
+        text_lower = " ".join(_normalizer.normalize_words(text_lower.split(), language))
+    words = set(text_lower.split())
+
+    # Verifica padrões negativos específicos
+    pattern_found = any(pattern in text_lower for pattern in negative_patterns)
+
+    positive_count = len(words.intersection(positive_words))
+    negative_count = len(words.intersection(negative_words))
+
+    # Se encontrou padrão negativo, aumenta peso negativo
+    if pattern_found:
+        negative_count += 2
+    if positive_count > negative_count:
+        sentiment = "positivo"
+        confidence = min(0.85, 0.5 + (positive_count - negative_count) * 0.1)
+        # Identifica palavras positivas encontradas
+        positive_found = [word for word in words if word in positive_words]
+        if positive_found:
+            explanation = f"Texto contém palavras positivas como '{', '.join(positive_found[:3])}', indicando sentimento favorável"
+        else:
+            explanation = "Análise indica tom positivo baseado no contexto geral"
+    elif negative_count > positive_count:
+        sentiment = "negativo"
+        confidence = min(0.85, 0.5 + (negative_count - positive_count) * 0.1)
+        # Identifica palavras negativas encontradas
+        negative_found = [word for word in words if word in negative_words]
+        patterns_found = [pattern for pattern in negative_patterns if pattern in text_lower]
+
+        if patterns_found and negative_found:
+            explanation = f"Texto expressa frustração com frases como '{patterns_found[0]}' e palavras negativas como '{', '.join(negative_found[:2])}'"
+        elif patterns_found:
+            explanation = f"Detectada expressão negativa: '{patterns_found[0]}'"
+        elif negative_found:
+            explanation = f"Presença de palavras negativas: '{', '.join(negative_found[:3])}'"
+        else:
+            explanation = "Análise indica tom negativo baseado no contexto"
+    else:
+        sentiment = "neutro"
+        confidence = 0.5
+        explanation = "Texto não apresenta palavras claramente positivas ou negativas, mantendo tom neutro"
+
+    return sentiment, confidence, explanation
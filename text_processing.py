@@ -0,0 +1,108 @@
+"""
+Funções de tokenização compartilhadas entre a API e o cache de análises
+
+A normalização opcional (remoção de acentos e redução de plurais em português)
+também fica aqui, para que contagem de frequências, busca e léxicos usem
+exatamente as mesmas palavras.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Sequências de caracteres de palavra; equivale a clean_text(text).split()
+WORD_PATTERN = re.compile(r"\w+")
+
+# Idiomas em que o stemmer leve (regras de plural do português) é aplicado
+STEM_LANGUAGES: Tuple[str, ...] = ("pt",)
+
+# Regras de redução de plural no estilo do passo 1 do RSLP:
+# (sufixo, tamanho mínimo do radical, substituição, exceções)
+_PLURAL_RULES: Tuple[Tuple[str, int, str, frozenset], ...] = (
+    ("ns", 1, "m", frozenset()),
+    ("ões", 1, "ão", frozenset()),
+    ("ães", 1, "ão", frozenset({"mães"})),
+    ("ais", 1, "al", frozenset({"cais", "mais"})),
+    ("éis", 2, "el", frozenset()),
+    ("eis", 2, "el", frozenset()),
+    ("óis", 2, "ol", frozenset()),
+    ("is", 2, "il", frozenset({"lápis", "cais", "mais", "crúcis", "biquínis", "pois", "depois", "dois", "leis"})),
+    ("les", 3, "l", frozenset()),
+    ("res", 3, "r", frozenset({"árvores"})),
+    ("s", 2, "", frozenset({
+        "aliás", "pires", "lápis", "cais", "mais", "mas", "menos", "férias", "fezes", "pêsames",
+        "crúcis", "gás", "atrás", "moisés", "através", "convés", "ês", "país", "após", "ambas",
+        "ambos", "messias", "depois", "pois", "nós", "vós", "três", "mês", "simples",
+    })),
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Retorna as palavras do texto em minúsculas, sem pontuação"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def fold_accents(word: str) -> str:
+    """Remove acentos e cedilha ("ação" -> "acao")"""
+    if word.isascii():
+        return word
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def light_stem(word: str) -> str:
+    """Stemmer leve do português: reduz plurais ao singular ("problemas" -> "problema")"""
+    if not word.endswith("s"):
+        return word
+    for suffix, min_stem, replacement, exceptions in _PLURAL_RULES:
+        if word.endswith(suffix):
+            if word in exceptions or len(word) - len(suffix) < min_stem:
+                return word
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+class TextNormalizer:
+    """
+    Normaliza palavras já tokenizadas (stemmer leve e remoção de acentos)
+
+    O resultado de cada palavra fica em um memo LRU limitado; como o vocabulário
+    segue a lei de Zipf, quase todas as consultas são acertos no memo.
+    """
+
+    def __init__(self, fold: bool = True, stem: bool = True, cache_size: int = 50_000):
+        self.fold = fold
+        self.stem = stem
+        self.cache_size = cache_size
+        self._normalize = lru_cache(maxsize=cache_size)(self._normalize_uncached)
+
+    def _normalize_uncached(self, word: str, language: str) -> str:
+        # O stemmer vem antes: as regras de plural usam os acentos ("ões", "éis")
+        if self.stem and language in STEM_LANGUAGES:
+            word = light_stem(word)
+        if self.fold:
+            word = fold_accents(word)
+        return word
+
+    def normalize(self, word: str, language: str = "pt") -> str:
+        return self._normalize(word, language)
+
+    def normalize_words(self, words: Iterable[str], language: str = "pt") -> List[str]:
+        return list(map(self._normalize, words, repeat(language)))
+
+    def normalize_phrase(self, phrase: str, language: str = "pt") -> str:
+        """Normaliza um trecho de texto palavra a palavra, mantendo espaços simples"""
+        return " ".join(self.normalize_words(tokenize(phrase), language))
+
+    def metrics(self) -> Dict[str, Any]:
+        info = self._normalize.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "fold_accents": self.fold,
+            "stem": self.stem,
+            "cache_size": info.currsize,
+            "cache_max_size": self.cache_size,
+            "cache_hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        }
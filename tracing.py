@@ -0,0 +1,204 @@
+"""
+Rastreamento leve das requisições
+
+Cada requisição HTTP recebe um trace com id próprio (ou o id recebido no
+cabeçalho X-Request-ID) e as etapas da análise registram spans com início e
+duração. O trace atual fica em uma ContextVar, então span() funciona em
+qualquer módulo sem receber o trace como parâmetro e não faz nada fora de uma
+requisição (por exemplo, no pool de processos). Traces acima do limite de
+lentidão vão para um buffer circular limitado, exposto em /debug/traces, e
+podem ser exportados via OTLP para um coletor local.
+"""
+
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Trace de uma requisição com os spans das etapas"""
+
+    __slots__ = ("trace_id", "name", "start", "wall_start", "duration", "spans", "attributes")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        self.duration: Optional[float] = None
+        # (nome, início relativo, duração, atributos)
+        self.spans: List[tuple] = []
+        self.attributes: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.wall_start,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 3),
+                 "duration_ms": round(duration * 1000, 3), **({"attributes": attributes} if attributes else {})}
+                for name, offset, duration, attributes in self.spans
+            ],
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """Registra uma etapa no trace atual (não faz nada sem trace ativo)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, start - trace.start, time.perf_counter() - start, attributes))
+
+
+class OTLPExporter:
+    """Exporta traces via OTLP usando o SDK do OpenTelemetry (dependência opcional)"""
+
+    def __init__(self, endpoint: str, service_name: str = "api-analise-texto"):
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            raise ValueError(
+                "A exportação OTLP requer opentelemetry-sdk e opentelemetry-exporter-otlp-proto-http"
+            ) from e
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        # Envio em lote por uma thread do SDK: a requisição não espera o coletor
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        self._provider = provider
+        self._tracer = provider.get_tracer(__name__)
+
+    def export(self, trace: Trace):
+        from opentelemetry import trace as otel_trace
+
+        def to_ns(offset: float) -> int:
+            return int((trace.wall_start + offset) * 1e9)
+
+        root = self._tracer.start_span(trace.name, start_time=to_ns(0), attributes={
+            "trace.id": trace.trace_id, **{key: str(value) for key, value in trace.attributes.items()}
+        })
+        context = otel_trace.set_span_in_context(root)
+        for name, offset, duration, attributes in trace.spans:
+            child = self._tracer.start_span(name, context=context, start_time=to_ns(offset),
+                                            attributes={key: str(value) for key, value in attributes.items()})
+            child.end(end_time=to_ns(offset + duration))
+        root.end(end_time=to_ns(trace.duration))
+
+    def shutdown(self):
+        self._provider.shutdown()
+
+
+class Tracer:
+    """Inicia e encerra traces, guardando os lentos em um buffer circular"""
+
+    def __init__(self, slow_threshold: float = 0.5, buffer_size: int = 100,
+                 exporter: Optional[OTLPExporter] = None, enabled: bool = True):
+        self.slow_threshold = slow_threshold
+        self.enabled = enabled
+        self.exporter = exporter
+        self._slow: deque = deque(maxlen=buffer_size)
+        # Métricas
+        self.traces = 0
+        self.slow_traces = 0
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None) -> Iterator[Optional[Trace]]:
+        """Ativa um trace para o bloco (incluindo as tarefas criadas dentro dele)"""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(name, trace_id)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            self.finish(trace)
+
+    def finish(self, trace: Trace):
+        trace.duration = time.perf_counter() - trace.start
+        self.traces += 1
+        if trace.duration >= self.slow_threshold:
+            self.slow_traces += 1
+            self._slow.append(trace)
+        if self.exporter is not None:
+            try:
+                self.exporter.export(trace)
+            except Exception as e:
+                logger.error(f"Erro ao exportar trace {trace.trace_id}: {e}")
+
+    def slow_traces_snapshot(self) -> List[Dict[str, Any]]:
+        """Traces lentos guardados, do mais recente ao mais antigo"""
+        return [trace.to_dict() for trace in reversed(self._slow)]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "slow_threshold_ms": round(self.slow_threshold * 1000),
+            "buffer_size": self._slow.maxlen,
+            "traces": self.traces,
+            "slow_traces": self.slow_traces,
+            "otlp_export": self.exporter is not None,
+        }
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+class TracingMiddleware:
+    """Middleware ASGI que abre um trace por requisição HTTP e devolve X-Trace-Id"""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", ()):
+            if key == b"x-request-id":
+                # Aceita ids de até 64 caracteres vindos de proxies e clientes
+                request_id = value.decode("latin-1")[:64] or None
+                break
+
+        with self.tracer.trace(f"{scope['method']} {scope['path']}", request_id) as trace:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    trace.attributes["status"] = message["status"]
+                    message["headers"] = [*message.get("headers", []),
+                                          (b"x-trace-id", trace.trace_id.encode("latin-1"))]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
+
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Treino e avaliação offline do classificador local de sentimento
+
+Lê um arquivo JSONL com {"text": ..., "sentiment": "positivo|negativo|neutro"}
+(por exemplo, textos já rotulados pelo Gemini), avalia em uma parte separada
+(acurácia, comparação com as palavras-chave e cobertura no limite de confiança),
+treina com todos os exemplos e grava os pesos em .npz.
+
+Uso: python train_sentiment_model.py [--data data/sentiment_seed.jsonl]
+     [--output models/sentiment.npz] [--threshold 0.8]
+"""
+
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+
+from sentiment_model import DEFAULT_DIMENSIONS, SentimentClassifier
+
+
+def load_dataset(path: Path):
+    with open(path, encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file if line.strip()]
+    return [row["text"] for row in rows], [row["sentiment"] for row in rows]
+
+
+def evaluate(model: SentimentClassifier, texts, labels, threshold: float) -> dict:
+    """Acurácia geral, fração respondida localmente no limite e acurácia dessa fração"""
+    from text_analysis import compute_simple_sentiment
+
+    predictions = model.predict(texts)
+    correct = [label == expected for (label, _), expected in zip(predictions, labels)]
+    confident = [confidence >= threshold for _, confidence in predictions]
+    answered = [hit for hit, local in zip(correct, confident) if local]
+    keywords = [compute_simple_sentiment(text)[0] == expected for text, expected in zip(texts, labels)]
+    return {
+        "examples": len(texts),
+        "accuracy": round(sum(correct) / len(texts), 3),
+        "keyword_accuracy": round(sum(keywords) / len(texts), 3),
+        "threshold": threshold,
+        "answered_locally": round(len(answered) / len(texts), 3),
+        "local_accuracy": round(sum(answered) / len(answered), 3) if answered else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", type=Path, default=Path("data/sentiment_seed.jsonl"))
+    parser.add_argument("--output", type=Path, default=Path("models/sentiment.npz"))
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--learning-rate", type=float, default=5.0)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--test-fraction", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    texts, labels = load_dataset(args.data)
+    examples = list(zip(texts, labels))
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.test_fraction))
+    train, test = examples[:split], examples[split:]
+    options = dict(dimensions=args.dimensions, epochs=args.epochs,
+                   learning_rate=args.learning_rate, l2=args.l2)
+
+    if test:
+        model = SentimentClassifier.train(*zip(*train), **options)
+        report = evaluate(model, *map(list, zip(*test)), args.threshold)
+        print(f"Avaliação ({len(train)} treino / {len(test)} teste): {json.dumps(report)}")
+
+    # Modelo final com todos os exemplos
+    model = SentimentClassifier.train(texts, labels, **options)
+    os.makedirs(args.output.parent, exist_ok=True)
+    model.save(str(args.output))
+    print(f"Modelo {model.version} gravado em {args.output} ({args.output.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()